@@ -1,10 +1,16 @@
 from . import template_composer
-from .aws_deployer import CloudFormationDeployer, AWSDeploymentError
+from .aws_deployer import get_cached_deployer, AWSDeploymentError
 from .key_pair_manager import create_key_pairs_for_deployment, cleanup_key_pairs_for_stack
 from datetime import datetime
 from pathlib import Path
 import json
 
+# orjson (optional) pretty-prints large templates much faster than the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def createGeneration(data: dict, save_to_file: bool = True, build_id: str = None, key_pairs: dict = None):
     """
@@ -40,12 +46,13 @@ def createGeneration(data: dict, save_to_file: bool = True, build_id: str = None
         # Ensure createdCFs directory exists
         output_path.parent.mkdir(exist_ok=True)
         
-        # Convert to JSON and save with pretty formatting
-        cf_json = CFTemplate.to_json()
-        cf_dict = json.loads(cf_json)
-        
-        with open(output_path, 'w') as f:
-            json.dump(cf_dict, f, indent=2)
+        # Save with pretty formatting (sorted keys, matching to_json())
+        if orjson is not None:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(CFTemplate.to_dict(), option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        else:
+            with open(output_path, 'w') as f:
+                json.dump(CFTemplate.to_dict(), f, indent=2, sort_keys=True)
         
         print(f"\n✓ CloudFormation template saved to: {output_path.relative_to(Path(__file__).parent.parent)}")
     
@@ -105,7 +112,7 @@ def deployToAWS(canvas_data: dict, stack_name: str = None, region: str = 'us-eas
         
         # Step 3: Initialize AWS deployer
         print(f"\n[3/5] Initializing AWS deployer (region: {region})...")
-        deployer = CloudFormationDeployer(region=region)
+        deployer = get_cached_deployer(region)
         print("✓ AWS deployer initialized")
         
         # Step 4: Auto-discover VPC resources
@@ -209,7 +216,7 @@ def getStackStatus(stack_name: str, region: str = 'us-east-1'):
         }
     """
     try:
-        deployer = CloudFormationDeployer(region=region)
+        deployer = get_cached_deployer(region)
         status_info = deployer.get_stack_status(stack_name)
         
         return {
@@ -262,7 +269,7 @@ def deleteStack(stack_name: str, region: str = 'us-east-1', cleanup_key_pairs: b
         
         # Step 1: Delete CloudFormation stack
         print(f"\n[1/2] Deleting CloudFormation stack '{stack_name}'...")
-        deployer = CloudFormationDeployer(region=region)
+        deployer = get_cached_deployer(region)
         deployer.cf_client.delete_stack(StackName=stack_name)
         print(f"✓ Stack deletion initiated")
         
@@ -270,7 +277,6 @@ def deleteStack(stack_name: str, region: str = 'us-east-1', cleanup_key_pairs: b
         key_pairs_deleted = 0
         if cleanup_key_pairs:
             print(f"\n[2/2] Cleaning up SSH key pairs...")
-            from .key_pair_manager import cleanup_key_pairs_for_stack
             key_pairs_deleted = cleanup_key_pairs_for_stack(stack_name, region)
             print(f"✓ Deleted {key_pairs_deleted} key pair(s)")
         else:
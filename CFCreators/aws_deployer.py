@@ -4,6 +4,7 @@ AWS CloudFormation Deployment Module
 Simple, universal CloudFormation deployment that works with any template.
 """
 
+import threading
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 from typing import Dict, Optional
@@ -432,3 +433,29 @@ class CloudFormationDeployer:
             raise AWSDeploymentError(f"Failed to delete change set: {error_msg}")
 
 
+
+# One deployer per region, reused so boto3 client setup (credential and
+# endpoint resolution) happens once per process
+_DEPLOYER_CACHE: Dict[str, CloudFormationDeployer] = {}
+_DEPLOYER_LOCK = threading.Lock()
+
+
+def get_cached_deployer(region: str = 'us-east-1') -> CloudFormationDeployer:
+    """
+    Get a shared CloudFormationDeployer for a region, creating it on first use.
+    Creation is locked so concurrent requests can't build duplicate deployers.
+    
+    Args:
+        region: AWS region of the deployer
+        
+    Returns:
+        CloudFormationDeployer for that region
+    """
+    deployer = _DEPLOYER_CACHE.get(region)
+    if deployer is None:
+        with _DEPLOYER_LOCK:
+            deployer = _DEPLOYER_CACHE.get(region)
+            if deployer is None:
+                deployer = CloudFormationDeployer(region=region)
+                _DEPLOYER_CACHE[region] = deployer
+    return deployer
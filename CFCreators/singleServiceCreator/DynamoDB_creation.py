@@ -3,6 +3,9 @@ from typing import Dict, Any, List
 from troposphere import Template, Ref, Tags, Output, GetAtt
 import troposphere.dynamodb as dynamodb
 
+# Non-alphanumeric characters allowed in DynamoDB table names
+_DYNAMODB_NAME_SYMBOLS = frozenset('_-.')
+
 
 def sanitize_dynamodb_name(name: str) -> str:
     """
@@ -21,10 +24,7 @@ def sanitize_dynamodb_name(name: str) -> str:
     # Replace invalid characters (spaces, colons, etc.) with hyphens
     valid_chars = []
     for char in name:
-        if char.isalnum() or char in ['_', '-', '.']:
-            valid_chars.append(char)
-        else:
-            valid_chars.append('-')
+        valid_chars.append(char if char.isalnum() or char in _DYNAMODB_NAME_SYMBOLS else '-')
     
     # Join and remove consecutive hyphens
     name = ''.join(valid_chars)
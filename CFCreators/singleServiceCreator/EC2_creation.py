@@ -13,6 +13,9 @@ IMAGE_NAME_TO_SSM = {
     # If macOS support is needed, user must provide a specific AMI ID from their dedicated host setup
 }
 
+# Non-alphanumeric characters allowed in EC2 Name tags
+_EC2_NAME_SYMBOLS = frozenset('_-')
+
 
 def sanitize_ec2_name(name: str) -> str:
     """
@@ -30,10 +33,7 @@ def sanitize_ec2_name(name: str) -> str:
     # Replace invalid characters (colons, spaces, etc.) with hyphens
     valid_chars = []
     for char in name:
-        if char.isalnum() or char in ['_', '-']:
-            valid_chars.append(char)
-        else:
-            valid_chars.append('-')
+        valid_chars.append(char if char.isalnum() or char in _EC2_NAME_SYMBOLS else '-')
     
     # Join and remove consecutive hyphens
     name = ''.join(valid_chars)
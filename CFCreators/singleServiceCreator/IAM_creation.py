@@ -1,8 +1,34 @@
 # IAM_creation.py
 from typing import Dict, Any, List
-from troposphere import Template, Ref, GetAtt, Sub
+import itertools
+import json
+import time
+from troposphere import Template, Ref, GetAtt, Sub, encode_to_dict
 import troposphere.iam as iam
 
+# Fallback unique numbers: seeded from the clock once at import, then incremented
+# so roles created within the same second never collide
+_UNIQUE_COUNTER = itertools.count(time.time_ns() // 1_000_000_000)
+
+# Actions granted to EC2 for each connected service
+_S3_ACTIONS = (
+    "s3:GetObject",
+    "s3:PutObject",
+    "s3:DeleteObject",
+    "s3:ListBucket",
+)
+_DYNAMODB_ACTIONS = (
+    "dynamodb:GetItem",
+    "dynamodb:PutItem",
+    "dynamodb:UpdateItem",
+    "dynamodb:DeleteItem",
+    "dynamodb:Query",
+    "dynamodb:Scan",
+)
+
+# Non-alphanumeric characters allowed in IAM names
+_IAM_NAME_SYMBOLS = frozenset('-_+=.@')
+
 
 def sanitize_iam_name(name: str) -> str:
     """
@@ -27,10 +53,7 @@ def sanitize_iam_name(name: str) -> str:
     # Replace invalid characters (colons, etc.) with hyphens
     valid_chars = []
     for char in name:
-        if char.isalnum() or char in ['-', '_', '+', '=', '.', '@']:
-            valid_chars.append(char)
-        else:
-            valid_chars.append('-')
+        valid_chars.append(char if char.isalnum() or char in _IAM_NAME_SYMBOLS else '-')
     
     # Join and remove consecutive hyphens
     name = ''.join(valid_chars)
@@ -47,47 +70,127 @@ def sanitize_iam_name(name: str) -> str:
     return name
 
 
-def create_ec2_s3_role(
-    t: Template,
-    s3_bucket_resource,
-    *,
-    logical_id: str = None,
-    build_id: str = "default",
-    unique_id: str = None
-) -> tuple:
+def _fast_sanitize(name: str) -> str:
     """
-    Create IAM role and instance profile for EC2 to access S3.
+    Sanitize a name, skipping the full pass when it is already alphanumeric.
     
-    Args:
-        t: Troposphere Template object
-        s3_bucket_resource: The S3 bucket resource object
-        logical_id: CloudFormation logical resource ID (auto-generated if None)
-        build_id: Build ID to prefix the role name
-        unique_id: Unique identifier for stable naming (e.g., EC2 node ID)
+    Alphanumeric strings are returned unchanged by sanitize_iam_name, so the
+    common case (node IDs) costs a single C-level isalnum() check.
+    """
+    return name if name.isalnum() else sanitize_iam_name(name)
+
+
+def _make_policy(policy_name: str, actions, resources) -> iam.Policy:
+    """
+    Build an inline IAM policy with a single Allow statement.
     
+    Args:
+        policy_name: Name of the inline policy
+        actions: Iterable of IAM actions to allow
+        resources: Resource ARN (or list of ARNs) the actions apply to
+        
     Returns:
-        Tuple of (iam_role, instance_profile)
+        Troposphere IAM Policy object
+    """
+    return iam.Policy(
+        PolicyName=policy_name,
+        PolicyDocument={
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow",
+                "Action": list(actions),
+                "Resource": resources
+            }]
+        }
+    )
+
+
+def _merge_policy_statements(policies: List[iam.Policy]) -> List[iam.Policy]:
     """
+    Merge statements with identical Effect and Action across inline policies.
     
-    # Generate unique identifiers: <build_id>-<unique_number>-<purpose>
-    # Use unique_id if provided for stability, otherwise fallback to timestamp
-    if unique_id:
-        unique_number = sanitize_iam_name(unique_id[:6])  # SANITIZE unique_id portion!
-    else:
-        import time
-        unique_number = str(int(time.time()))[-6:]
+    Resources of merged statements are combined (duplicates removed, order kept)
+    into the first matching statement; policies left without statements are dropped.
+    Keeps the role's aggregate inline policy size under the IAM 10,240-character limit.
     
-    sanitized_build_id = sanitize_iam_name(build_id)  # Sanitize build_id too
-    role_name = f"{sanitized_build_id}-{unique_number}-ec2-s3-role"
-    policy_name = f"{sanitized_build_id}-{unique_number}-s3-access-policy"
+    Args:
+        policies: Inline policies built with _make_policy
+        
+    Returns:
+        List of policies with merged, de-duplicated statements
+    """
+    merged = {}  # {(effect, frozenset(actions)): statement}
+    result = []
+    
+    for policy in policies:
+        kept = []
+        for statement in policy.PolicyDocument["Statement"]:
+            actions = statement["Action"]
+            key = (statement["Effect"], frozenset([actions] if isinstance(actions, str) else actions))
+            resources = statement["Resource"]
+            if not isinstance(resources, list):
+                resources = [resources]
+            
+            if key not in merged:
+                merged[key] = {**statement, "Resource": []}
+                kept.append(merged[key])
+            merged[key]["Resource"].extend(resources)
+        
+        if kept:
+            policy.PolicyDocument["Statement"] = kept
+            result.append(policy)
+    
+    # De-duplicate resources by their rendered form (intrinsics are not hashable by value)
+    for statement in merged.values():
+        unique_resources = {
+            json.dumps(encode_to_dict(resource), sort_keys=True): resource
+            for resource in statement["Resource"]
+        }
+        statement["Resource"] = list(unique_resources.values())
+    
+    return result
+
+
+def _resolve_unique_number(unique_id: str = None) -> str:
+    """
+    Resolve the <unique_number> portion of IAM resource names.
     
-    # Generate logical ID if not provided
-    if logical_id is None:
-        logical_id = f"IAM{build_id.replace('-', '').replace(':', '').title()}{unique_number.replace('-', '').replace(':', '')}EC2S3Role"
+    Args:
+        unique_id: Unique identifier for stable naming (e.g., EC2 node ID)
+        
+    Returns:
+        Sanitized first 6 characters of unique_id, or a timestamp counter value
+    """
+    # Use unique_id if provided for stability, otherwise fallback to timestamp counter
+    if unique_id:
+        return _fast_sanitize(unique_id[:6])  # SANITIZE unique_id portion!
+    return str(next(_UNIQUE_COUNTER))[-6:]
+
+
+def _add_role_with_instance_profile(
+    t: Template,
+    logical_id: str,
+    role_name: str,
+    instance_profile_name: str,
+    policies: List[iam.Policy],
+    purpose: str,
+    build_id: str
+) -> tuple:
+    """
+    Add an EC2-assumable IAM role and its instance profile to the template.
     
-    print(f"  → Generated unique IAM role name: {role_name}")
-    print(f"  → Generated logical ID: {logical_id}")
+    Args:
+        t: Troposphere Template object
+        logical_id: CloudFormation logical resource ID of the role
+        role_name: Explicit IAM role name
+        instance_profile_name: Explicit instance profile name
+        policies: Inline policies attached to the role
+        purpose: Value for the OriginalPurpose tag
+        build_id: Build ID for the BuildId tag
     
+    Returns:
+        Tuple of (iam_role, instance_profile)
+    """
     # Create IAM Role with EC2 assume role policy
     role = iam.Role(
         logical_id,
@@ -100,30 +203,10 @@ def create_ec2_s3_role(
                 "Action": "sts:AssumeRole"
             }]
         },
-        Policies=[
-            iam.Policy(
-                PolicyName=policy_name,  # Use generated unique policy name
-                PolicyDocument={
-                    "Version": "2012-10-17",
-                    "Statement": [{
-                        "Effect": "Allow",
-                        "Action": [
-                            "s3:GetObject",
-                            "s3:PutObject",
-                            "s3:DeleteObject",
-                            "s3:ListBucket"
-                        ],
-                        "Resource": [
-                            GetAtt(s3_bucket_resource, "Arn"),              # Bucket itself
-                            Sub(f"${{BucketArn}}/*", BucketArn=GetAtt(s3_bucket_resource, "Arn"))  # Objects in bucket
-                        ]
-                    }]
-                }
-            )
-        ],
+        Policies=policies,
         Tags=[
             {"Key": "Name", "Value": role_name},
-            {"Key": "OriginalPurpose", "Value": "ec2-s3-access"},
+            {"Key": "OriginalPurpose", "Value": purpose},
             {"Key": "ManagedBy", "Value": "CloudFormation"},
             {"Key": "BuildId", "Value": build_id}
         ]
@@ -132,11 +215,8 @@ def create_ec2_s3_role(
     t.add_resource(role)
     
     # Create Instance Profile (required bridge between IAM role and EC2)
-    instance_profile_name = f"{sanitized_build_id}-{unique_number}-ec2-s3-profile"
-    instance_profile_logical_id = f"{logical_id}InstanceProfile"
-    
     instance_profile = iam.InstanceProfile(
-        instance_profile_logical_id,
+        f"{logical_id}InstanceProfile",
         InstanceProfileName=instance_profile_name,  # Explicit instance profile name
         Roles=[Ref(role)]
     )
@@ -146,6 +226,61 @@ def create_ec2_s3_role(
     return role, instance_profile
 
 
+def create_ec2_s3_role(
+    t: Template,
+    s3_bucket_resource,
+    *,
+    logical_id: str = None,
+    build_id: str = "default",
+    unique_id: str = None
+) -> tuple:
+    """
+    Create IAM role and instance profile for EC2 to access S3.
+    
+    Args:
+        t: Troposphere Template object
+        s3_bucket_resource: The S3 bucket resource object
+        logical_id: CloudFormation logical resource ID (auto-generated if None)
+        build_id: Build ID to prefix the role name
+        unique_id: Unique identifier for stable naming (e.g., EC2 node ID)
+    
+    Returns:
+        Tuple of (iam_role, instance_profile)
+    """
+    
+    # Generate unique identifiers: <build_id>-<unique_number>-<purpose>
+    unique_number = _resolve_unique_number(unique_id)
+    
+    sanitized_build_id = sanitize_iam_name(build_id)  # Sanitize build_id too
+    role_name = f"{sanitized_build_id}-{unique_number}-ec2-s3-role"
+    policy_name = f"{sanitized_build_id}-{unique_number}-s3-access-policy"
+    
+    # Generate logical ID if not provided
+    if logical_id is None:
+        logical_id = f"IAM{build_id.replace('-', '').replace(':', '').title()}{unique_number.replace('-', '').replace(':', '')}EC2S3Role"
+    
+    print(f"  → Generated unique IAM role name: {role_name}")
+    print(f"  → Generated logical ID: {logical_id}")
+    
+    bucket_arn = GetAtt(s3_bucket_resource, "Arn")
+    policies = [
+        _make_policy(
+            policy_name,  # Use generated unique policy name
+            _S3_ACTIONS,
+            [
+                bucket_arn,                                      # Bucket itself
+                Sub("${BucketArn}/*", BucketArn=bucket_arn)      # Objects in bucket
+            ]
+        )
+    ]
+    
+    return _add_role_with_instance_profile(
+        t, logical_id, role_name,
+        f"{sanitized_build_id}-{unique_number}-ec2-s3-profile",
+        policies, "ec2-s3-access", build_id
+    )
+
+
 def create_ec2_dynamodb_role(
     t: Template,
     dynamodb_table_resource,
@@ -169,12 +304,7 @@ def create_ec2_dynamodb_role(
     """
     
     # Generate unique identifiers: <build_id>-<unique_number>-<purpose>
-    # Use unique_id if provided for stability, otherwise fallback to timestamp
-    if unique_id:
-        unique_number = sanitize_iam_name(unique_id[:6])  # SANITIZE unique_id portion!
-    else:
-        import time
-        unique_number = str(int(time.time()))[-6:]
+    unique_number = _resolve_unique_number(unique_id)
     
     sanitized_build_id = sanitize_iam_name(build_id)  # Sanitize build_id too
     role_name = f"{sanitized_build_id}-{unique_number}-ec2-dynamodb-role"
@@ -187,61 +317,19 @@ def create_ec2_dynamodb_role(
     print(f"  → Generated unique IAM role name: {role_name}")
     print(f"  → Generated logical ID: {logical_id}")
     
-    # Create IAM Role with EC2 assume role policy
-    role = iam.Role(
-        logical_id,
-        RoleName=role_name,  # Explicit role name for consistency
-        AssumeRolePolicyDocument={
-            "Version": "2012-10-17",
-            "Statement": [{
-                "Effect": "Allow",
-                "Principal": {"Service": "ec2.amazonaws.com"},
-                "Action": "sts:AssumeRole"
-            }]
-        },
-        Policies=[
-            iam.Policy(
-                PolicyName=policy_name,  # Use generated unique policy name
-                PolicyDocument={
-                    "Version": "2012-10-17",
-                    "Statement": [{
-                        "Effect": "Allow",
-                        "Action": [
-                            "dynamodb:GetItem",
-                            "dynamodb:PutItem",
-                            "dynamodb:UpdateItem",
-                            "dynamodb:DeleteItem",
-                            "dynamodb:Query",
-                            "dynamodb:Scan"
-                        ],
-                        "Resource": GetAtt(dynamodb_table_resource, "Arn")
-                    }]
-                }
-            )
-        ],
-        Tags=[
-            {"Key": "Name", "Value": role_name},
-            {"Key": "OriginalPurpose", "Value": "ec2-dynamodb-access"},
-            {"Key": "ManagedBy", "Value": "CloudFormation"},
-            {"Key": "BuildId", "Value": build_id}
-        ]
-    )
-    
-    t.add_resource(role)
-    
-    # Create Instance Profile
-    instance_profile_name = f"{sanitized_build_id}-{unique_number}-ec2-dynamodb-profile"
-    instance_profile_logical_id = f"{logical_id}InstanceProfile"
+    policies = [
+        _make_policy(
+            policy_name,  # Use generated unique policy name
+            _DYNAMODB_ACTIONS,
+            GetAtt(dynamodb_table_resource, "Arn")
+        )
+    ]
     
-    instance_profile = iam.InstanceProfile(
-        instance_profile_logical_id,
-        InstanceProfileName=instance_profile_name,  # Explicit instance profile name
-        Roles=[Ref(role)]
+    return _add_role_with_instance_profile(
+        t, logical_id, role_name,
+        f"{sanitized_build_id}-{unique_number}-ec2-dynamodb-profile",
+        policies, "ec2-dynamodb-access", build_id
     )
-    
-    t.add_resource(instance_profile)
-    
-    return role, instance_profile
 
 
 def create_ec2_multi_service_role(
@@ -267,12 +355,7 @@ def create_ec2_multi_service_role(
     """
     
     # Generate unique identifiers: <build_id>-<unique_number>-<purpose>
-    # Use unique_id if provided for stability, otherwise fallback to timestamp
-    if unique_id:
-        unique_number = sanitize_iam_name(unique_id[:6])  # SANITIZE unique_id portion!
-    else:
-        import time
-        unique_number = str(int(time.time()))[-6:]
+    unique_number = _resolve_unique_number(unique_id)
     
     sanitized_build_id = sanitize_iam_name(build_id)  # Sanitize build_id too
     role_name = f"{sanitized_build_id}-{unique_number}-ec2-multi-service-role"
@@ -286,91 +369,43 @@ def create_ec2_multi_service_role(
     
     policies = []
     
+    # Local aliases so the per-bucket/per-table loops below avoid global lookups
+    _GetAtt = GetAtt
+    _Sub = Sub
+    
     # Add S3 policies if S3 buckets exist
-    if "s3_buckets" in services and services["s3_buckets"]:
-        s3_resources = []
-        for bucket in services["s3_buckets"]:
-            s3_resources.append(GetAtt(bucket, "Arn"))
-            # Use Sub() to concatenate GetAtt with string
-            s3_resources.append(Sub(f"${{BucketArn}}/*", BucketArn=GetAtt(bucket, "Arn")))
+    s3_buckets = services.get("s3_buckets")
+    if s3_buckets:
+        # Bucket ARN followed by its objects (Sub() concatenates GetAtt with a string)
+        s3_resources = [
+            resource
+            for bucket_arn in (_GetAtt(bucket, "Arn") for bucket in s3_buckets)
+            for resource in (bucket_arn, _Sub("${BucketArn}/*", BucketArn=bucket_arn))
+        ]
         
         policies.append(
-            iam.Policy(
-                PolicyName=f"{sanitized_build_id}-{unique_number}-s3-access-policy",  # Unique policy name
-                PolicyDocument={
-                    "Version": "2012-10-17",
-                    "Statement": [{
-                        "Effect": "Allow",
-                        "Action": [
-                            "s3:GetObject",
-                            "s3:PutObject",
-                            "s3:DeleteObject",
-                            "s3:ListBucket"
-                        ],
-                        "Resource": s3_resources
-                    }]
-                }
+            _make_policy(
+                f"{sanitized_build_id}-{unique_number}-s3-access-policy",  # Unique policy name
+                _S3_ACTIONS,
+                s3_resources
             )
         )
     
     # Add DynamoDB policies if tables exist
-    if "dynamodb_tables" in services and services["dynamodb_tables"]:
-        dynamodb_resources = [GetAtt(table, "Arn") for table in services["dynamodb_tables"]]
+    dynamodb_tables = services.get("dynamodb_tables")
+    if dynamodb_tables:
+        dynamodb_resources = [_GetAtt(table, "Arn") for table in dynamodb_tables]
         
         policies.append(
-            iam.Policy(
-                PolicyName=f"{sanitized_build_id}-{unique_number}-dynamodb-access-policy",  # Unique policy name
-                PolicyDocument={
-                    "Version": "2012-10-17",
-                    "Statement": [{
-                        "Effect": "Allow",
-                        "Action": [
-                            "dynamodb:GetItem",
-                            "dynamodb:PutItem",
-                            "dynamodb:UpdateItem",
-                            "dynamodb:DeleteItem",
-                            "dynamodb:Query",
-                            "dynamodb:Scan"
-                        ],
-                        "Resource": dynamodb_resources
-                    }]
-                }
+            _make_policy(
+                f"{sanitized_build_id}-{unique_number}-dynamodb-access-policy",  # Unique policy name
+                _DYNAMODB_ACTIONS,
+                dynamodb_resources
             )
         )
     
-    # Create IAM Role
-    role = iam.Role(
-        logical_id,
-        RoleName=role_name,  # Explicit role name for consistency
-        AssumeRolePolicyDocument={
-            "Version": "2012-10-17",
-            "Statement": [{
-                "Effect": "Allow",
-                "Principal": {"Service": "ec2.amazonaws.com"},
-                "Action": "sts:AssumeRole"
-            }]
-        },
-        Policies=policies,
-        Tags=[
-            {"Key": "Name", "Value": role_name},
-            {"Key": "OriginalPurpose", "Value": "ec2-multi-service-access"},
-            {"Key": "ManagedBy", "Value": "CloudFormation"},
-            {"Key": "BuildId", "Value": build_id}
-        ]
+    return _add_role_with_instance_profile(
+        t, logical_id, role_name,
+        f"{sanitized_build_id}-{unique_number}-ec2-multi-service-profile",
+        _merge_policy_statements(policies), "ec2-multi-service-access", build_id
     )
-    
-    t.add_resource(role)
-    
-    # Create Instance Profile
-    instance_profile_name = f"{sanitized_build_id}-{unique_number}-ec2-multi-service-profile"
-    instance_profile_logical_id = f"{logical_id}InstanceProfile"
-    
-    instance_profile = iam.InstanceProfile(
-        instance_profile_logical_id,
-        InstanceProfileName=instance_profile_name,  # Explicit instance profile name
-        Roles=[Ref(role)]
-    )
-    
-    t.add_resource(instance_profile)
-    
-    return role, instance_profile
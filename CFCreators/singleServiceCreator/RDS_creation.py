@@ -1,9 +1,48 @@
 # RDS_creation.py
 from typing import Dict, Any
-from troposphere import Template, Ref, Tags, Output, GetAtt, Sub
+from functools import lru_cache
+import logging
+import re
+from troposphere import Template, Ref, Output, GetAtt, Sub
 import troposphere.rds as rds
+from ._sanitize import _sanitize_core, _DROP_HYPHEN, _logical_id_part
 
 
+logger = logging.getLogger(__name__)
+
+
+# Fn::Sub template for an instance ARN; %s is the instance's logical ID
+_ARN_RDS_TMPL = "arn:aws:rds:${AWS::Region}:${AWS::AccountId}:db:${%s}"
+
+# Static tag shared by every RDS instance
+_MANAGED_BY_TAG = {"Key": "ManagedBy", "Value": "CloudFormation"}
+
+# (output suffix, GetAtt attribute, description template) for each GetAtt output
+_GETATT_OUTPUTS = (
+    ("Endpoint", "Endpoint.Address", "Connection endpoint for %s"),
+    ("Port", "Endpoint.Port", "Port number for %s"),
+)
+
+
+# A valid RDS identifier: 1-63 chars of a-z/0-9/'-', starting with a letter,
+# with no trailing hyphen and no consecutive hyphens
+_RDS_ID_RE = re.compile(r'(?!.*--)[a-z][a-z0-9-]{0,62}(?<!-)')
+
+
+def is_valid_rds_identifier(identifier: str) -> bool:
+    """
+    Check whether a string already meets RDS identifier requirements.
+    
+    Args:
+        identifier: Identifier string to check
+        
+    Returns:
+        True if the identifier can be used unchanged
+    """
+    return _RDS_ID_RE.fullmatch(identifier) is not None
+
+
+@lru_cache(maxsize=2048)
 def sanitize_rds_identifier(identifier: str) -> str:
     """
     Sanitize a string to meet RDS identifier requirements.
@@ -20,29 +59,15 @@ def sanitize_rds_identifier(identifier: str) -> str:
     Returns:
         Sanitized identifier that meets RDS requirements
     """
-    # Convert to lowercase
-    identifier = identifier.lower()
-    
-    # Replace invalid characters with hyphens
-    valid_chars = []
-    for char in identifier:
-        if char.isalnum():
-            valid_chars.append(char)
-        elif char in ['-', '_', ' ']:
-            valid_chars.append('-')
-        else:
-            valid_chars.append('-')
-    
-    # Join and remove consecutive hyphens
-    identifier = ''.join(valid_chars)
-    while '--' in identifier:
-        identifier = identifier.replace('--', '-')
-    
-    # Remove leading/trailing hyphens
-    identifier = identifier.strip('-')
-    
-    # Ensure it starts with a letter
-    if identifier and not identifier[0].isalpha():
+    # Fast path: already a valid identifier, return unchanged
+    if is_valid_rds_identifier(identifier):
+        return identifier
+    
+    # Lowercase, replace invalid characters with hyphens, collapse and strip hyphens
+    identifier = _sanitize_core(identifier)
+    
+    # Ensure it starts with a letter (only a-z can remain after sanitizing)
+    if identifier and not ('a' <= identifier[0] <= 'z'):
         identifier = 'db' + identifier
     
     # Ensure it's not empty and not too long
@@ -92,10 +117,10 @@ def add_rds_instance(
     # Generate logical ID if not provided
     if logical_id is None:
         # CloudFormation logical IDs can't have hyphens, use CamelCase
-        logical_id = f"RDS{build_id.replace('-', '').title()}{unique_number.replace('-', '')}{user_db_name.replace('-', '').title()}"
+        logical_id = f"RDS{_logical_id_part(build_id)}{unique_number.translate(_DROP_HYPHEN)}{_logical_id_part(user_db_name)}"
     
-    print(f"  → Generated unique RDS instance identifier: {db_instance_identifier}")
-    print(f"  → Generated logical ID: {logical_id}")
+    logger.debug("Generated unique RDS instance identifier: %s", db_instance_identifier)
+    logger.debug("Generated logical ID: %s", logical_id)
     
     # Build properties with hardcoded defaults
     props: Dict[str, Any] = dict(
@@ -128,14 +153,14 @@ def add_rds_instance(
         DBSubnetGroupName=Ref(subnet_group_param),
         VPCSecurityGroups=[Ref(sg_param)],
         
-        # Tags for resource management
-        Tags=Tags(
-            Name=db_instance_identifier,
-            OriginalName=data['dbName'],
-            ManagedBy="CloudFormation",
-            Engine=data["engine"],
-            BuildId=build_id,
-        ),
+        # Tags for resource management (plain list, sorted by key like troposphere's Tags)
+        Tags=[
+            {"Key": "BuildId", "Value": build_id},
+            {"Key": "Engine", "Value": data["engine"]},
+            _MANAGED_BY_TAG,
+            {"Key": "Name", "Value": db_instance_identifier},
+            {"Key": "OriginalName", "Value": data['dbName']},
+        ],
     )
     
     # Engine version: use latest stable (AWS will auto-select)
@@ -147,20 +172,18 @@ def add_rds_instance(
     
     # Helpful outputs (namespaced to avoid collisions with multiple RDS instances)
     t.add_output([
-        Output(
-            f"{logical_id}Endpoint",
-            Description=f"Connection endpoint for {db_instance_identifier}",
-            Value=GetAtt(instance, "Endpoint.Address")
-        ),
-        Output(
-            f"{logical_id}Port",
-            Description=f"Port number for {db_instance_identifier}",
-            Value=GetAtt(instance, "Endpoint.Port")
+        *(
+            Output(
+                f"{logical_id}{suffix}",
+                Description=description % db_instance_identifier,
+                Value=GetAtt(instance, attribute)
+            )
+            for suffix, attribute, description in _GETATT_OUTPUTS
         ),
         Output(
             f"{logical_id}Arn",
             Description=f"ARN of {db_instance_identifier}",
-            Value=Sub(f"arn:aws:rds:${{AWS::Region}}:${{AWS::AccountId}}:db:${{{logical_id}}}")
+            Value=Sub(_ARN_RDS_TMPL % logical_id)
         ),
         Output(
             f"{logical_id}InstanceId",
@@ -1,13 +1,66 @@
 # S3_creation.py
 from typing import Dict, Any
+from functools import lru_cache
+import logging
+import hashlib
+import secrets
 from troposphere import Template, Ref, Output, GetAtt, Sub, Tags
 import troposphere.s3 as s3
+from ._sanitize import _sanitize_core, _DROP_HYPHEN, _logical_id_part
 
 
-def generate_unique_bucket_name(user_bucket_name: str = None, build_id: str = "default", node_id: str = None) -> str:
+logger = logging.getLogger(__name__)
+
+
+def _stable_hex(value: str) -> str:
     """
-    Generate a unique S3 bucket name following the pattern:
-    <build_id>-<unique_number>-<user_bucket_name>
+    Deterministic 6-character hex digest of value (same input, same output across runs).
+    """
+    return hashlib.blake2b(value.encode(), digest_size=3).hexdigest()
+
+
+# Hardcoded bucket security settings. These never vary per bucket, so they are
+# built (and validated by troposphere) once at import and shared by every bucket.
+
+# Encryption configuration (always enabled)
+_DEFAULT_BUCKET_ENCRYPTION = s3.BucketEncryption(
+    ServerSideEncryptionConfiguration=[
+        s3.ServerSideEncryptionRule(
+            ServerSideEncryptionByDefault=s3.ServerSideEncryptionByDefault(
+                SSEAlgorithm="AES256"
+            )
+        )
+    ]
+)
+
+# Public access block configuration (always block public access)
+_DEFAULT_PUBLIC_ACCESS_BLOCK = s3.PublicAccessBlockConfiguration(
+    BlockPublicAcls=True,
+    BlockPublicPolicy=True,
+    IgnorePublicAcls=True,
+    RestrictPublicBuckets=True
+)
+
+# Ownership controls (disable ACLs - AWS best practice)
+_DEFAULT_OWNERSHIP_CONTROLS = s3.OwnershipControls(
+    Rules=[
+        s3.OwnershipControlsRule(
+            ObjectOwnership="BucketOwnerEnforced"
+        )
+    ]
+)
+
+
+# (GetAtt attribute, description) for each GetAtt output; the attribute is also the output suffix
+_GETATT_OUTPUTS = (
+    ("Arn", "ARN of the S3 bucket"),
+    ("DomainName", "Domain name of the S3 bucket"),
+)
+
+
+def _generate_bucket_name_parts(user_bucket_name: str = None, build_id: str = "default", node_id: str = None) -> tuple:
+    """
+    Build the unique S3 bucket name along with the sanitized parts it was made from.
     
     Args:
         user_bucket_name: User-specified bucket name (optional)
@@ -15,26 +68,19 @@ def generate_unique_bucket_name(user_bucket_name: str = None, build_id: str = "d
         node_id: Node ID from canvas for stability (optional)
         
     Returns:
-        Unique bucket name in lowercase
-        
-    Example:
-        default-a1b2c3-my-app-storage
-        prod-123-d4e5f6-user-uploads
-        
-    Note:
-        - All parts are converted to lowercase and sanitized for S3 requirements
-        - If no user_bucket_name provided, defaults to "bucket"
+        Tuple of (bucket_name, unique_number, sanitized_user_name)
     """
     # Generate unique number (6 characters) - use node ID if available for stability
+    # (kept as the node ID prefix so deployed bucket names don't change on update)
     if node_id:
         unique_number = sanitize_bucket_name_part(node_id[:6])  # SANITIZE node_id portion!
     else:
-        # Fallback to timestamp-based for backwards compatibility
-        import time
-        unique_number = str(int(time.time()))[-6:]
+        # No node ID: fall back to 6 random hex characters so two unnamed
+        # buckets never share a name (S3 bucket names are globally unique)
+        unique_number = secrets.token_hex(3)
     
     # Sanitize build_id as well
-    build_id = sanitize_bucket_name_part(build_id)
+    sanitized_build_id = sanitize_bucket_name_part(build_id)
     
     # Sanitize and use user bucket name, or default to "bucket"
     if user_bucket_name:
@@ -42,26 +88,44 @@ def generate_unique_bucket_name(user_bucket_name: str = None, build_id: str = "d
     else:
         sanitized_user_name = "bucket"
     
-    # Sanitize build_id as well to be safe
-    sanitized_build_id = sanitize_bucket_name_part(build_id)
-    
     # Build bucket name: <build_id>-<unique_number>-<user_name>
-    bucket_name = f"{sanitized_build_id}-{unique_number}-{sanitized_user_name}"
-    
-    # Ensure it meets S3 naming requirements
-    bucket_name = bucket_name.lower()
+    # All parts are already lowercase; budget the user name so the result
+    # fits the 63 char S3 limit without rebuilding it
+    prefix = f"{sanitized_build_id}-{unique_number}-"
+    bucket_name = f"{prefix}{sanitized_user_name[:63 - len(prefix)]}"
     
-    # Truncate if too long (max 63 chars)
-    if len(bucket_name) > 63:
-        # Keep build_id and unique_number, truncate user name
-        prefix = f"{sanitized_build_id}-{unique_number}-"
-        max_user_name_length = 63 - len(prefix)
-        truncated_user_name = sanitized_user_name[:max_user_name_length]
-        bucket_name = f"{prefix}{truncated_user_name}"
+    return bucket_name, unique_number, sanitized_user_name
+
+
+def generate_unique_bucket_name(user_bucket_name: str = None, build_id: str = "default", node_id: str = None) -> str:
+    """
+    Generate a unique S3 bucket name following the pattern:
+    <build_id>-<unique_number>-<user_bucket_name>
     
-    return bucket_name
+    Args:
+        user_bucket_name: User-specified bucket name (optional)
+        build_id: Build ID to prefix the bucket name
+        node_id: Node ID from canvas for stability (optional)
+        
+    Returns:
+        Unique bucket name in lowercase
+        
+    Example:
+        default-a1b2c3-my-app-storage
+        prod-123-d4e5f6-user-uploads
+        
+    Note:
+        - All parts are converted to lowercase and sanitized for S3 requirements
+        - If no user_bucket_name provided, defaults to "bucket"
+    """
+    return _generate_bucket_name_parts(user_bucket_name, build_id, node_id)[0]
+
 
+# Characters allowed in a sanitized bucket name part
+_VALID_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789-')
 
+
+@lru_cache(maxsize=2048)
 def sanitize_bucket_name_part(name: str) -> str:
     """
     Sanitize a part of the bucket name to meet S3 requirements.
@@ -72,25 +136,18 @@ def sanitize_bucket_name_part(name: str) -> str:
     Returns:
         Sanitized name part (lowercase, only letters/numbers/hyphens)
     """
-    # Convert to lowercase
-    name = name.lower()
-    
-    # Replace invalid characters with hyphens
-    valid_chars = []
-    for char in name:
-        if char.isalnum():
-            valid_chars.append(char)
-        elif char in ['-', '_']:
-            valid_chars.append('-')
-        else:
-            valid_chars.append('-')
-    
-    # Join and remove consecutive hyphens
-    name = ''.join(valid_chars)
-    while '--' in name:
-        name = name.replace('--', '-')
-    
-    return name.strip('-')
+    # Fast path: already sanitized, return unchanged
+    if (
+        name
+        and name[0] != '-'
+        and name[-1] != '-'
+        and _VALID_CHARS.issuperset(name)
+        and '--' not in name
+    ):
+        return name
+    
+    # Lowercase, replace invalid characters with hyphens, collapse and strip hyphens
+    return _sanitize_core(name)
 
 
 def add_s3_bucket(
@@ -128,20 +185,20 @@ def add_s3_bucket(
     user_bucket_name = data.get("bucketName")
     
     # Generate unique bucket name using consistent pattern with node ID for stability
-    bucket_name = generate_unique_bucket_name(
+    bucket_name, _, sanitized_user_name = _generate_bucket_name_parts(
         user_bucket_name=user_bucket_name,
         build_id=build_id,
         node_id=node['id']  # Use node ID for stable bucket names across regenerations
     )
     
-    # Generate unique number for logical ID if not provided
+    # Generate logical ID if not provided (reuses the bucket name's sanitized user name)
     if logical_id is None:
-        unique_number = node['id'][:6]  # Use node ID for stability
-        sanitized_user_name = sanitize_bucket_name_part(user_bucket_name) if user_bucket_name else "Bucket"
-        logical_id = f"S3{build_id.replace('-', '').title()}{unique_number}{sanitized_user_name.title()}"
+        # CloudFormation logical IDs can't have hyphens, use CamelCase
+        # Hash the full node ID: 6-char prefixes collide for IDs like "dndnode_0"/"dndnode_1"
+        logical_id = f"S3{_logical_id_part(build_id)}{_stable_hex(node['id'])}{_logical_id_part(sanitized_user_name)}"
     
-    print(f"  → Generated unique S3 bucket name: {bucket_name}")
-    print(f"  → Generated logical ID: {logical_id}")
+    logger.debug("Generated unique S3 bucket name: %s", bucket_name)
+    logger.debug("Generated logical ID: %s", logical_id)
     
     # Build bucket properties
     props: Dict[str, Any] = dict(
@@ -156,33 +213,10 @@ def add_s3_bucket(
             BuildId=build_id,
         ),
         
-        # Encryption configuration (always enabled)
-        BucketEncryption=s3.BucketEncryption(
-            ServerSideEncryptionConfiguration=[
-                s3.ServerSideEncryptionRule(
-                    ServerSideEncryptionByDefault=s3.ServerSideEncryptionByDefault(
-                        SSEAlgorithm="AES256"
-                    )
-                )
-            ]
-        ),
-        
-        # Public access block configuration (always block public access)
-        PublicAccessBlockConfiguration=s3.PublicAccessBlockConfiguration(
-            BlockPublicAcls=True,
-            BlockPublicPolicy=True,
-            IgnorePublicAcls=True,
-            RestrictPublicBuckets=True
-        ),
-        
-        # Ownership controls (disable ACLs - AWS best practice)
-        OwnershipControls=s3.OwnershipControls(
-            Rules=[
-                s3.OwnershipControlsRule(
-                    ObjectOwnership="BucketOwnerEnforced"
-                )
-            ]
-        )
+        # Hardcoded security settings (shared module-level objects)
+        BucketEncryption=_DEFAULT_BUCKET_ENCRYPTION,
+        PublicAccessBlockConfiguration=_DEFAULT_PUBLIC_ACCESS_BLOCK,
+        OwnershipControls=_DEFAULT_OWNERSHIP_CONTROLS
     )
     
     # Create the S3 bucket
@@ -201,15 +235,13 @@ def add_s3_bucket(
             Value=user_bucket_name or "bucket",
             Description="User's original bucket name"
         ),
-        Output(
-            f"{logical_id}Arn",
-            Value=GetAtt(bucket, "Arn"),
-            Description="ARN of the S3 bucket"
-        ),
-        Output(
-            f"{logical_id}DomainName",
-            Value=GetAtt(bucket, "DomainName"),
-            Description="Domain name of the S3 bucket"
+        *(
+            Output(
+                f"{logical_id}{attribute}",
+                Value=GetAtt(bucket, attribute),
+                Description=description
+            )
+            for attribute, description in _GETATT_OUTPUTS
         )
     ])
     
@@ -0,0 +1,44 @@
+# _sanitize.py
+# Name sanitizing helpers shared by the S3 and RDS creators
+from functools import lru_cache
+import re
+
+
+# Byte translation table for a name: A-Z -> a-z, a-z/0-9 kept, everything else -> '-'
+_BYTE_TABLE = bytes(
+    b + 32 if 0x41 <= b <= 0x5a else b if (0x30 <= b <= 0x39 or 0x61 <= b <= 0x7a) else 0x2d
+    for b in range(256)
+)
+
+# Runs of two or more hyphens
+_DEDUP_HYPHEN = re.compile(rb'-{2,}')
+
+
+@lru_cache(maxsize=2048)
+def _sanitize_core(value: str) -> str:
+    """
+    Lowercase, replace invalid characters with hyphens, collapse hyphen runs and
+    strip leading/trailing hyphens.
+    
+    Works on the ASCII-encoded bytes (non-ASCII characters encode to '?', which
+    maps to '-') so lowercasing and mapping happen in one bytes.translate call.
+    S3 bucket names and RDS identifiers share this step; each caller adds its
+    own service-specific rules on top.
+    """
+    encoded = value.encode('ascii', 'replace').translate(_BYTE_TABLE)
+    if b'--' in encoded:
+        encoded = _DEDUP_HYPHEN.sub(b'-', encoded)
+    return encoded.strip(b'-').decode('ascii')
+
+
+# Translation table that deletes hyphens (CloudFormation logical IDs are alphanumeric)
+_DROP_HYPHEN = str.maketrans('', '', '-')
+
+
+@lru_cache(maxsize=1024)
+def _logical_id_part(value: str) -> str:
+    """
+    Drop hyphens and title-case a name for use inside a CloudFormation logical ID.
+    Cached since the same build_id is reused for every resource in a template.
+    """
+    return value.translate(_DROP_HYPHEN).title()
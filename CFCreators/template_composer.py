@@ -1,26 +1,40 @@
 # make_stack.py
-from troposphere import Template, Parameter, Ref
+from collections import defaultdict
+from functools import lru_cache
+from troposphere import Template, Parameter, Ref, GetAtt
 from datetime import datetime
 from .singleServiceCreator import (
     EC2_creation, S3_creation, RDS_creation, DynamoDB_creation,
     create_ec2_s3_role, create_ec2_dynamodb_role, create_ec2_multi_service_role
 )
 
-def make_stack_template(normalized: dict, build_id: str = None, key_pairs: dict = None) -> Template:
-    t = Template()
-    t.set_version("2010-09-09")  # AWSTemplateFormatVersion
-    t.set_description("Foundry v1 - Single stack for EC2/S3/RDS/DynamoDB")
 
-    # Check if we have RDS nodes to determine if we need RDS-specific parameters
-    has_rds = any(node.get("type") == "RDS" for node in normalized.get("nodes", []))
-    
-    # Build parameter list dynamically based on resource types
+# Source node type -> key in an EC2's dependency map
+_DEPENDENCY_KEYS = {"S3": "s3", "DynamoDB": "dynamodb", "RDS": "rds"}
+
+# Shared default for an EC2 with no connections (tuples, so safe to share)
+_EMPTY_DEPS = {"s3": (), "dynamodb": (), "rds": ()}
+
+# Env var names for the first 64 connections of each type (first one is unnumbered);
+# anything past that is formatted on the fly
+_S3_ENV_NAMES = ("S3_BUCKET_NAME",) + tuple(f"S3_BUCKET_{i}" for i in range(2, 65))
+_DYNAMODB_ENV_NAMES = ("DYNAMODB_TABLE_NAME",) + tuple(f"DYNAMODB_TABLE_{i}" for i in range(2, 65))
+_DB_PREFIXES = ("DB_",) + tuple(f"DB_{i}_" for i in range(2, 65))
+
+# Translation table that deletes the characters not allowed in a logical ID
+_SANITIZE_TABLE = str.maketrans("", "", "-:_")
+
+
+def _interface_metadata(has_rds: bool) -> dict:
+    """
+    Console parameter grouping metadata; the parameter list depends only on whether RDS is present.
+    Returns a fresh dict on every call so templates never share (and mutate) the same metadata.
+    """
     parameter_list = ["SubnetId", "SecurityGroupId"]
     if has_rds:
         parameter_list.append("DBSubnetGroupName")
     
-    # Optional: helpful parameter UI grouping in the Console
-    t.set_metadata({
+    return {
         "AWS::CloudFormation::Interface": {
             "ParameterGroups": [
                 {
@@ -34,7 +48,83 @@ def make_stack_template(normalized: dict, build_id: str = None, key_pairs: dict
                 "DBSubnetGroupName": {"default": "DB Subnet Group"},
             }
         }
-    })
+    }
+
+
+@lru_cache(maxsize=1024)
+def _sanitize(node_id: str) -> str:
+    """Strip '-', ':' and '_' from a node ID for use in a CloudFormation logical ID."""
+    return node_id.translate(_SANITIZE_TABLE)
+
+
+def _build_s3_ref(t: Template, node: dict) -> tuple:
+    """Add the S3 bucket for node and return (node_id, resource ref)."""
+    node_id = node.get('id')
+    logical_id = f"S3{_sanitize(node_id)}"
+    s3_resource = S3_creation.add_s3_bucket(t, node, logical_id=logical_id)
+    return node_id, {
+        "type": "S3",
+        "logical_id": logical_id,
+        "resource": s3_resource
+    }
+
+
+def _build_rds_ref(t: Template, node: dict, db_subnet_group_param, sg_param, build_id: str) -> tuple:
+    """Add the RDS instance for node and return (node_id, resource ref with connection info)."""
+    node_id = node.get('id')
+    logical_id = f"RDS{_sanitize(node_id)}"
+    rds_resource = RDS_creation.add_rds_instance(
+        t, node, db_subnet_group_param, sg_param,
+        logical_id=logical_id, build_id=build_id
+    )
+    data = node.get("data") or {}
+    return node_id, {
+        "type": "RDS",
+        "logical_id": logical_id,
+        "resource": rds_resource,
+        "db_name": data.get("dbName", ""),
+        "master_username": data.get("masterUsername", ""),
+        "master_password": data.get("masterUserPassword", ""),
+        "engine": data.get("engine", "postgres"),
+    }
+
+
+def _build_dynamodb_ref(t: Template, node: dict, build_id: str) -> tuple:
+    """Add the DynamoDB table for node and return (node_id, resource ref)."""
+    node_id = node.get('id')
+    logical_id = f"DynamoDB{_sanitize(node_id)}"
+    dynamodb_resource = DynamoDB_creation.add_dynamodb_table(
+        t, node, logical_id=logical_id, build_id=build_id
+    )
+    return node_id, {
+        "type": "DynamoDB",
+        "logical_id": logical_id,
+        "resource": dynamodb_resource
+    }
+
+
+def make_stack_template(normalized: dict, build_id: str = None, key_pairs: dict = None) -> Template:
+    t = Template()
+    t.set_version("2010-09-09")  # AWSTemplateFormatVersion
+    t.set_description("Foundry v1 - Single stack for EC2/S3/RDS/DynamoDB")
+
+    nodes = normalized.get("nodes", [])
+    
+    # Index nodes by ID so edges resolve in O(1) instead of scanning every node
+    node_by_id = {n.get("id"): n for n in nodes}
+    
+    # Bucket nodes by type in one pass so each phase walks only the nodes it needs
+    nodes_by_type = {"S3": [], "RDS": [], "DynamoDB": [], "EC2": []}
+    for n in nodes:
+        bucket = nodes_by_type.get(n.get("type"))
+        if bucket is not None:
+            bucket.append(n)
+
+    # Check if we have RDS nodes to determine if we need RDS-specific parameters
+    has_rds = bool(nodes_by_type["RDS"])
+    
+    # Optional: helpful parameter UI grouping in the Console
+    t.set_metadata(_interface_metadata(has_rds))
 
     # v1 networking parameters
     vpc_param = t.add_parameter(Parameter("VpcId", Type="AWS::EC2::VPC::Id", Description="(Reserved for future use)"))
@@ -64,127 +154,101 @@ def make_stack_template(normalized: dict, build_id: str = None, key_pairs: dict
     
     # ========== PHASE 1: Parse edges and build dependency map ==========
     edges = normalized.get("edges", [])
-    ec2_dependencies = {}  # {ec2_node_id: {"s3": [s3_nodes], "dynamodb": [dynamo_nodes], "rds": [rds_nodes]}}
+    ec2_dependencies = defaultdict(lambda: {"s3": [], "dynamodb": [], "rds": []})  # {ec2_node_id: {"s3": [s3_nodes], "dynamodb": [dynamo_nodes], "rds": [rds_nodes]}}
     
     for edge in edges:
         source = edge.get("source")  # Resource providing data (S3, RDS, DynamoDB)
         target = edge.get("target")  # EC2 that needs access
         
         # Find the node types
-        source_node = next((n for n in normalized.get("nodes", []) if n.get("id") == source), None)
-        target_node = next((n for n in normalized.get("nodes", []) if n.get("id") == target), None)
+        source_node = node_by_id.get(source)
+        target_node = node_by_id.get(target)
         
         if not source_node or not target_node:
             continue
         
-        source_type = source_node.get("type")
-        target_type = target_node.get("type")
-        
         # We only handle EC2 as target (EC2 → S3, EC2 → RDS, EC2 → DynamoDB)
-        if target_type == "EC2":
-            if target not in ec2_dependencies:
-                ec2_dependencies[target] = {"s3": [], "dynamodb": [], "rds": []}
-            
-            if source_type == "S3":
-                ec2_dependencies[target]["s3"].append(source)
-            elif source_type == "DynamoDB":
-                ec2_dependencies[target]["dynamodb"].append(source)
-            elif source_type == "RDS":
-                ec2_dependencies[target]["rds"].append(source)
+        dependency_key = _DEPENDENCY_KEYS.get(source_node.get("type"))
+        if dependency_key and target_node.get("type") == "EC2":
+            ec2_dependencies[target][dependency_key].append(source)
     
     # ========== PHASE 2: Create non-EC2 resources first and store references ==========
-    resource_refs = {}  # {node_id: {"type": "S3", "logical_id": "S3bucket1", "resource": <obj>}}
+    # {node_id: {"type": "S3", "logical_id": "S3bucket1", "resource": <obj>}}
+    resource_refs = dict(_build_s3_ref(t, node) for node in nodes_by_type["S3"])
+    resource_refs.update(
+        _build_rds_ref(t, node, db_subnet_group_param, sg_param, build_id)
+        for node in nodes_by_type["RDS"]
+    )
+    resource_refs.update(
+        _build_dynamodb_ref(t, node, build_id)
+        for node in nodes_by_type["DynamoDB"]
+    )
+    
+    # ========== PHASE 3: Create EC2 instances with IAM roles and env vars ==========
+    no_dependencies = not ec2_dependencies
     
-    for node in normalized.get("nodes", []):
+    for node in nodes_by_type["EC2"]:
         node_id = node.get('id')
-        node_type = node.get('type')
-        
-        if node_type == "S3":
-            sanitized_id = node_id.replace('-', '').replace(':', '').replace('_', '')
-            logical_id = f"S3{sanitized_id}"
-            s3_resource = S3_creation.add_s3_bucket(t, node, logical_id=logical_id)
-            resource_refs[node_id] = {
-                "type": "S3",
-                "logical_id": logical_id,
-                "resource": s3_resource
-            }
+        sanitized_id = _sanitize(node_id)
+        logical_id = f"EC2{sanitized_id}"
         
-        elif node_type == "RDS":
-            sanitized_id = node_id.replace('-', '').replace(':', '').replace('_', '')
-            logical_id = f"RDS{sanitized_id}"
-            rds_resource = RDS_creation.add_rds_instance(
-                t, node, db_subnet_group_param, sg_param,
-                logical_id=logical_id, build_id=build_id
-            )
-            resource_refs[node_id] = {
-                "type": "RDS",
-                "logical_id": logical_id,
-                "resource": rds_resource,
-                "db_name": node.get("data", {}).get("dbName", ""),
-                "master_username": node.get("data", {}).get("masterUsername", ""),
-                "master_password": node.get("data", {}).get("masterUserPassword", ""),
-                "engine": node.get("data", {}).get("engine", "postgres"),
-            }
+        # Get key pair name for this instance if available
+        instance_key_name = None
+        if key_pairs:
+            instance_name = node.get('data', {}).get('name', '')
+            if instance_name in key_pairs:
+                instance_key_name = key_pairs[instance_name].get('keyName')
         
-        elif node_type == "DynamoDB":
-            sanitized_id = node_id.replace('-', '').replace(':', '').replace('_', '')
-            logical_id = f"DynamoDB{sanitized_id}"
-            dynamodb_resource = DynamoDB_creation.add_dynamodb_table(
-                t, node, logical_id=logical_id, build_id=build_id
+        # No EC2 has connections: skip the IAM/env var plumbing entirely
+        if no_dependencies:
+            EC2_creation.add_ec2_instance(
+                t, node, subnet_param, sg_param,
+                logical_id=logical_id,
+                instance_profile=None,
+                environment_variables=None,
+                build_id=build_id,
+                key_name=instance_key_name
             )
-            resource_refs[node_id] = {
-                "type": "DynamoDB",
-                "logical_id": logical_id,
-                "resource": dynamodb_resource
-            }
-    
-    # ========== PHASE 3: Create EC2 instances with IAM roles and env vars ==========
-    for node in normalized.get("nodes", []):
-        if node.get("type") != "EC2":
             continue
         
-        node_id = node.get('id')
-        sanitized_id = node_id.replace('-', '').replace(':', '').replace('_', '')
-        logical_id = f"EC2{sanitized_id}"
-        
         # Check if this EC2 has any dependencies
-        dependencies = ec2_dependencies.get(node_id, {"s3": [], "dynamodb": [], "rds": []})
-        has_s3 = len(dependencies["s3"]) > 0
-        has_dynamodb = len(dependencies["dynamodb"]) > 0
+        dependencies = ec2_dependencies.get(node_id, _EMPTY_DEPS)
         has_rds_dep = len(dependencies["rds"]) > 0
         
         instance_profile = None
         environment_variables = {}
         
+        # Resolve connected S3 buckets / DynamoDB tables once for both the IAM role and env vars
+        s3_resources = [
+            resource_refs[s3_id]["resource"]
+            for s3_id in dependencies["s3"]
+            if s3_id in resource_refs
+        ]
+        dynamodb_resources = [
+            resource_refs[dynamo_id]["resource"]
+            for dynamo_id in dependencies["dynamodb"]
+            if dynamo_id in resource_refs
+        ]
+        
         # If EC2 has connections, create IAM role and env vars
-        if has_s3 or has_dynamodb:
+        if s3_resources or dynamodb_resources:
             services = {}
             
             # Collect S3 buckets
-            if has_s3:
-                services["s3_buckets"] = [
-                    resource_refs[s3_id]["resource"] 
-                    for s3_id in dependencies["s3"] 
-                    if s3_id in resource_refs
-                ]
+            if s3_resources:
+                services["s3_buckets"] = s3_resources
                 # Add S3 bucket names as environment variables
-                for idx, s3_id in enumerate(dependencies["s3"]):
-                    if s3_id in resource_refs:
-                        env_var_name = f"S3_BUCKET_{idx+1}" if idx > 0 else "S3_BUCKET_NAME"
-                        environment_variables[env_var_name] = Ref(resource_refs[s3_id]["resource"])
+                for idx, s3_resource in enumerate(s3_resources):
+                    env_var_name = _S3_ENV_NAMES[idx] if idx < len(_S3_ENV_NAMES) else f"S3_BUCKET_{idx+1}"
+                    environment_variables[env_var_name] = Ref(s3_resource)
             
             # Collect DynamoDB tables
-            if has_dynamodb:
-                services["dynamodb_tables"] = [
-                    resource_refs[dynamo_id]["resource"]
-                    for dynamo_id in dependencies["dynamodb"]
-                    if dynamo_id in resource_refs
-                ]
+            if dynamodb_resources:
+                services["dynamodb_tables"] = dynamodb_resources
                 # Add DynamoDB table names as environment variables
-                for idx, dynamo_id in enumerate(dependencies["dynamodb"]):
-                    if dynamo_id in resource_refs:
-                        env_var_name = f"DYNAMODB_TABLE_{idx+1}" if idx > 0 else "DYNAMODB_TABLE_NAME"
-                        environment_variables[env_var_name] = Ref(resource_refs[dynamo_id]["resource"])
+                for idx, dynamodb_resource in enumerate(dynamodb_resources):
+                    env_var_name = _DYNAMODB_ENV_NAMES[idx] if idx < len(_DYNAMODB_ENV_NAMES) else f"DYNAMODB_TABLE_{idx+1}"
+                    environment_variables[env_var_name] = Ref(dynamodb_resource)
             
             # Create multi-service IAM role
             iam_role, instance_profile = create_ec2_multi_service_role(
@@ -196,10 +260,7 @@ def make_stack_template(normalized: dict, build_id: str = None, key_pairs: dict
             for idx, rds_id in enumerate(dependencies["rds"]):
                 if rds_id in resource_refs:
                     rds_ref = resource_refs[rds_id]
-                    prefix = f"DB_{idx+1}_" if idx > 0 else "DB_"
-                    
-                    # Import GetAtt for RDS endpoint
-                    from troposphere import GetAtt
+                    prefix = _DB_PREFIXES[idx] if idx < len(_DB_PREFIXES) else f"DB_{idx+1}_"
                     
                     environment_variables[f"{prefix}HOST"] = GetAtt(rds_ref["resource"], "Endpoint.Address")
                     environment_variables[f"{prefix}PORT"] = GetAtt(rds_ref["resource"], "Endpoint.Port")
@@ -209,13 +270,6 @@ def make_stack_template(normalized: dict, build_id: str = None, key_pairs: dict
                     environment_variables[f"{prefix}ENGINE"] = rds_ref["engine"]
         
         # Create EC2 instance with IAM profile and environment variables
-        # Get key pair name for this instance if available
-        instance_key_name = None
-        if key_pairs:
-            instance_name = node.get('data', {}).get('name', '')
-            if instance_name in key_pairs:
-                instance_key_name = key_pairs[instance_name].get('keyName')
-        
         EC2_creation.add_ec2_instance(
             t, node, subnet_param, sg_param,
             logical_id=logical_id,
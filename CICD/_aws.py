@@ -0,0 +1,27 @@
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+#one session and one client per service for the whole process
+#building a client loads the service model (~100ms) and opens its own connection pool, so never do it per call
+#boto3 clients are thread safe, the asyncio.to_thread calls in code_Deploy.py can share them
+session = boto3.session.Session(region_name="us-east-1")
+
+#several builds can deploy at once through the shared clients, so give them more than the default 10 pooled connections
+_config = Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    retries={"mode": "adaptive", "max_attempts": 6},
+)
+
+s3_client = session.client("s3", config=_config)
+codedeploy_client = session.client("codedeploy", config=_config)
+codebuild_client = session.client("codebuild", config=_config)
+
+#every artifact upload uses this: big repo zips go up as 64 MiB parts, 16 at a time (fits in the 32 pooled connections)
+transfer_config = TransferConfig(
+    multipart_threshold=64 * 1024 * 1024,
+    multipart_chunksize=64 * 1024 * 1024,
+    max_concurrency=16,
+    use_threads=True,
+)
@@ -2,6 +2,9 @@ import zipfile
 import tempfile 
 import shutil
 import os
+import copy
+import struct
+import time
 
 fastapi_buildspec_template="""
 version: 0.2
@@ -18,7 +21,7 @@ phases:
   build:
     commands:
       - echo "Starting FastAPI build"
-      - zip -r app.zip .
+      - zip -0 -r app.zip .  # stored, CodeBuild compresses the artifact it uploads anyway
 artifacts:
   files:
     - '**/*'
@@ -51,59 +54,125 @@ hooks:
 
 
 
-def addBuildSpec(zip_path,buildSpec,overWrite=True): 
+#the zip only lives until codebuild picks it up, so favour speed over ratio when recompressing
+_COMPRESS_LEVEL = 1
+
+
+def _output_info(zi): #fresh ZipInfo for the output zip with the member's name, timestamp and permissions
+    out = zipfile.ZipInfo(zi.filename, zi.date_time)
+    out.external_attr = zi.external_attr
+    out.compress_type = zipfile.ZIP_STORED if zi.is_dir() else zipfile.ZIP_DEFLATED
+    out._compresslevel = _COMPRESS_LEVEL #ZipFile.open(zinfo) doesn't apply the archive's compresslevel
+    return out
+
+
+def _read_raw_header(zin, zi): #checks a member can be copied as-is and returns the offset of its compressed data
+    zin.fp.seek(zi.header_offset)
+    header = zin.fp.read(30) #fixed part of the local file header
+    if len(header) != 30 or header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {zi.filename}")
+    if zi.flag_bits & 0x1: #encrypted, let zipfile deal with it
+        raise NotImplementedError("encrypted member")
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    return zi.header_offset + 30 + name_len + extra_len
+
+
+def _copy_raw(zin, zout, zi, data_offset): #copies a member's compressed bytes straight across, no inflate/deflate
+    out = copy.copy(zi)
+    out.extra = b"" #drops any old zip64 field, FileHeader adds a fresh one if needed
+    out.flag_bits &= ~0x08 #sizes/CRC are known, so no trailing data descriptor
+    out.header_offset = zout.fp.tell()
+    zout.fp.write(out.FileHeader())
+
+    zin.fp.seek(data_offset)
+    remaining = zi.compress_size
+    while remaining:
+        chunk = zin.fp.read(min(remaining, 1 << 20))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data for {zi.filename}")
+        zout.fp.write(chunk)
+        remaining -= len(chunk)
+
+    #register the member the same way ZipFile.write does so it lands in the central directory
+    zout.start_dir = zout.fp.tell()
+    zout.filelist.append(out)
+    zout.NameToInfo[out.filename] = out
+    zout._didModify = True
+
+
+def _spec_info(target_path): #tiny text files gain nothing from deflate, store them; scripts get the executable bit
+    info = zipfile.ZipInfo(target_path, time.localtime(time.time())[:6])
+    info.compress_type = zipfile.ZIP_STORED
+    info.external_attr = (0o755 if target_path.endswith(".sh") else 0o644) << 16
+    return info
+
+
+def inject_files(zip_path,files,overWrite=True): #writes every {relative path: content} in files into the zip's root folder in one pass
 
     with zipfile.ZipFile(zip_path, 'r') as zin:  #open zip file and read it 
-        names = zin.namelist() #returns a list of file paths 
+        infos = zin.infolist() #returns a ZipInfo for every file path 
 
-        if not names: 
+        if not infos: 
            
             raise ValueError("Zip file is empty.")
-            return
         
-        rootFolder = names[0]
+        rootFolder = infos[0].filename
 
         root_prefix = rootFolder.split("/")[0] + "/"
 
-        target_path = root_prefix + "buildspec.yml"
-        print("Target path for buildspec:", target_path)
+        target_paths = {filename: root_prefix + filename for filename in files} #relative path -> path inside the zip
+        print("Target paths:", list(target_paths.values()))
+
+        skip = set(target_paths.values())
 
-        has_buildspec = target_path in names
+        #nothing to replace (the usual case for a fresh zipball): append the new entries and rewrite only the central directory
+        if not overWrite or skip.isdisjoint(zi.filename for zi in infos):
+            zin.close()
+            with zipfile.ZipFile(zip_path, 'a') as zout:
+                for filename, target_path in target_paths.items():
+                    zout.writestr(_spec_info(target_path), files[filename])
+                    print(f"Injected {filename} into ZIP.")
+            return target_paths
 
-   
-        tmp_dir,tmp_zip_path = tempfile.mkstemp() #makes temporary empty file
+        #makes temporary empty file next to the zip so the final rename stays on the same filesystem
+        tmp_fd,tmp_zip_path = tempfile.mkstemp(suffix=".zip.tmp", dir=os.path.dirname(os.path.abspath(zip_path)) or ".")
 
-        os.close(tmp_dir) #temp_dir is a file descriptor not needed so we close it
+        os.close(tmp_fd) #tmp_fd is a file descriptor not needed so we close it
         try:
-            with zipfile.ZipFile(tmp_zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zout:
-                for item in names:
-                    # Skip the old buildspec if we're overwriting
-                    if overWrite and item == target_path:
+            with zipfile.ZipFile(tmp_zip_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=_COMPRESS_LEVEL) as zout:
+                replaced = set()
+                for zi in infos:
+                    # Skip the old files, they get rewritten below
+                    if zi.filename in skip:
+                        replaced.add(zi.filename)
+                        continue
+                    # Copy the already-compressed bytes across when we can (relies on zipfile internals)
+                    try:
+                        data_offset = _read_raw_header(zin, zi)
+                    except (AttributeError, NotImplementedError, zipfile.BadZipFile, struct.error):
+                        data_offset = None
+                    if data_offset is not None:
+                        _copy_raw(zin, zout, zi, data_offset)
                         continue
-                    data = zin.read(item)
-                    zout.writestr(item, data)
+                    # Otherwise stream each member through a 1 MiB buffer instead of reading it whole
+                    with zin.open(zi) as src, zout.open(_output_info(zi), "w", force_zip64=True) as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
 
     
-                zout.writestr(target_path, buildSpec)
+                for filename, target_path in target_paths.items():
+                    zout.writestr(_spec_info(target_path), files[filename])
 
             
-            shutil.move(tmp_zip_path, zip_path)
-
-
-            print("file path for yaml to send to aws",target_path)
-
-       
+            os.replace(tmp_zip_path, zip_path) #atomic rename, no data copy
 
-            if has_buildspec and overWrite:
-                print("Replaced existing buildspec.yml in ZIP.")
-          
-            else:
-                print("Injected buildspec.yml into ZIP.")
+            for filename, target_path in target_paths.items():
+                if target_path in replaced:
+                    print(f"Replaced existing {filename} in ZIP.")
+                else:
+                    print(f"Injected {filename} into ZIP.")
 
-                return target_path
+            return target_paths #paths of the files inside the zip, buildspec.yml's is used as the buildspec override for codebuild
 
-
-               # print(names)
         finally:
            
             if os.path.exists(tmp_zip_path):
@@ -111,62 +180,42 @@ def addBuildSpec(zip_path,buildSpec,overWrite=True):
                     os.remove(tmp_zip_path)
                 except OSError:
                     pass
-def addAppSpec(zip_path,buildSpec,overWrite=True): 
-    
 
-    with zipfile.ZipFile(zip_path, 'r') as zin:  #open zip file and read it 
-        names = zin.namelist() #returns a list of file paths 
 
-        if not names: 
+def append_files(zip_file,files): #adds every {relative path: content} to the zip's root folder without rewriting what's already there
+    #zip_file can be a path or a seekable file object (e.g. an in-memory BytesIO)
+
+    with zipfile.ZipFile(zip_file, 'a') as zip_archive: #append mode writes the new entries and a new central directory only
+        infos = zip_archive.infolist()
+
+        if not infos: 
            
             raise ValueError("Zip file is empty.")
-            return
-        
-        rootFolder = names[0]
 
-        root_prefix = rootFolder.split("/")[0] + "/"
+        root_prefix = infos[0].filename.split("/")[0] + "/"
 
-        target_path = root_prefix + "appspec.yml"
-        print("Target path for appspec:", target_path)
+        target_paths = {filename: root_prefix + filename for filename in files} #relative path -> path inside the zip
 
-        has_buildspec = target_path in names
+        #append can't drop entries, so existing files need the full rewrite in inject_files
+        names = set(zip_archive.namelist())
+        existing = [target_path for target_path in target_paths.values() if target_path in names]
+        if existing:
+            raise FileExistsError(f"Already in ZIP: {existing}")
 
-   
-        tmp_dir,tmp_zip_path = tempfile.mkstemp() #makes temporary empty file
+        for filename, target_path in target_paths.items():
+            zip_archive.writestr(_spec_info(target_path), files[filename])
+            print(f"Injected {filename} into ZIP.")
 
-        os.close(tmp_dir) #temp_dir is a file descriptor not needed so we close it
-        try:
-            with zipfile.ZipFile(tmp_zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zout:
-                for item in names:
-                    # Skip the old buildspec if we're overwriting
-                    if overWrite and item == target_path:
-                        continue
-                    data = zin.read(item)
-                    zout.writestr(item, data)
+    return target_paths
 
-    
-                zout.writestr(target_path, buildSpec)
 
-            
-            shutil.move(tmp_zip_path, zip_path)
-
-            if has_buildspec and overWrite:
-                print("Replaced existing buildspec.yml in ZIP.")
-          
-            else:
-                print("Injected appSpec into ZIP.")
-               # print(names)
-        finally:
-           
-            if os.path.exists(tmp_zip_path):
-                try:
-                    os.remove(tmp_zip_path)
-                except OSError:
-                    pass
-            
-            
+def _inject_yaml(zip_path,filename,content,overWrite=True): #writes a single file into the zip's root folder
+    return inject_files(zip_path, {filename: content}, overWrite)[filename]
 
-    
 
-      
-    
+def addBuildSpec(zip_path,buildSpec,overWrite=True): 
+    return _inject_yaml(zip_path, "buildspec.yml", buildSpec, overWrite)
+
+
+def addAppSpec(zip_path,buildSpec,overWrite=True): 
+    return _inject_yaml(zip_path, "appspec.yml", buildSpec, overWrite)
@@ -1,4 +1,10 @@
 import requests
+from requests.adapters import HTTPAdapter
+
+# shared session so repeat calls reuse the TLS connection to api.github.com
+# (no retries: creating a hook isn't idempotent, a retried POST could add a duplicate)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
 def create_github_webhook(owner, repo, token, webhook_url):
   api_url = f"https://api.github.com/repos/{owner}/{repo}/hooks"
@@ -17,7 +23,7 @@ def create_github_webhook(owner, repo, token, webhook_url):
     }
   }
 
-  response = requests.post(api_url, json=payload, headers=headers)
+  response = _SESSION.post(api_url, json=payload, headers=headers)
   
   if response.status_code in [200,201]:
     print("Webhook created successfully!")
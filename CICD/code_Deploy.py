@@ -1,50 +1,80 @@
-import boto3
 import asyncio
+from CICD._aws import codedeploy_client as code_deploy
 
-async def codeDeploy(owner, repo, bucket_name, object_key,tag,emit_func):
+# get_* errors that just mean "not created yet"
+_MISSING = (
+    code_deploy.exceptions.ApplicationDoesNotExistException,
+    code_deploy.exceptions.DeploymentGroupDoesNotExistException,
+)
+
+
+async def _exists(get_call, **kwargs):
+    """Run a blocking CodeDeploy get_* call in a worker thread; False if the resource doesn't exist."""
+    try:
+        await asyncio.to_thread(get_call, **kwargs)
+        return True
+    except _MISSING:
+        return False
+
+
+async def codeDeploy(owner, repo, bucket_name, object_key,tag,emit_func,tag_key="BuildId"):
     """
     Deploys the latest build to EC2 using CodeDeploy.
     Automatically creates the application if it doesn't exist.
+    Instances are targeted by their tag_key=tag EC2 tag.
     """
 
     print("tag",tag)
 
-    code_deploy = boto3.client("codedeploy", region_name="us-east-1")
     application_name = f"{owner}-{repo}"
     deployment_group_name = repo
     service_role_arn = "arn:aws:iam::575380174326:role/serviceRoleCodeDeploy"  # Update if needed
 
     try:
+        # Probe the application and deployment group at the same time, then create only what's missing
+        tag_filters = [{'Key': tag_key, 'Value': tag, 'Type': 'KEY_AND_VALUE'}]
+        app_exists, group_exists = await asyncio.gather(
+            _exists(code_deploy.get_application, applicationName=application_name),
+            _exists(
+                code_deploy.get_deployment_group,
+                applicationName=application_name,
+                deploymentGroupName=deployment_group_name
+            ),
+        )
+
         # Ensure application exists
-        try:
-            code_deploy.get_application(applicationName=application_name)
+        if app_exists:
             print(f"Application '{application_name}' exists.")
-        except code_deploy.exceptions.ApplicationDoesNotExistException:
-            code_deploy.create_application(
+        else:
+            await asyncio.to_thread(
+                code_deploy.create_application,
                 applicationName=application_name,
                 computePlatform="Server"
             )
             print(f"Created CodeDeploy application '{application_name}'.")
 
         # Create or update deployment group
-        try:
-            code_deploy.create_deployment_group(
+        if group_exists:
+            await asyncio.to_thread(
+                code_deploy.update_deployment_group,
+                applicationName=application_name,
+                currentDeploymentGroupName=deployment_group_name,
+                ec2TagFilters=tag_filters
+            )
+            print(f"Updated deployment group '{deployment_group_name}'.")
+        else:
+            await asyncio.to_thread(
+                code_deploy.create_deployment_group,
                 applicationName=application_name,
                 deploymentGroupName=deployment_group_name,
                 serviceRoleArn=service_role_arn,
-                ec2TagFilters=[{'Key': 'BuildId', 'Value': tag, 'Type': 'KEY_AND_VALUE'}]
+                ec2TagFilters=tag_filters
             )
             print(f"Created deployment group '{deployment_group_name}'.")
-        except code_deploy.exceptions.DeploymentGroupAlreadyExistsException:
-            code_deploy.update_deployment_group(
-                applicationName=application_name,
-                currentDeploymentGroupName=deployment_group_name,
-                ec2TagFilters=[{'Key': 'BuildId', 'Value': tag, 'Type': 'KEY_AND_VALUE'}]
-            )
-            print(f"Updated deployment group '{deployment_group_name}'.")
 
         # Start deployment
-        response = code_deploy.create_deployment(
+        response = await asyncio.to_thread(
+            code_deploy.create_deployment,
             applicationName=application_name,
             deploymentGroupName=deployment_group_name,
             revision={
@@ -72,7 +102,8 @@ async def codeDeploy(owner, repo, bucket_name, object_key,tag,emit_func):
 
         while True:
 
-            deploy_response = code_deploy.get_deployment(deploymentId=deployment_identity) 
+            # run the blocking boto3 call in a worker thread so the event loop keeps serving other deployments
+            deploy_response = await asyncio.to_thread(code_deploy.get_deployment, deploymentId=deployment_identity)
 
             deployment_info = deploy_response['deploymentInfo']
 
@@ -88,7 +119,7 @@ async def codeDeploy(owner, repo, bucket_name, object_key,tag,emit_func):
             if status in ["Succeeded", "Failed", "Stopped", "TimedOut"]:
                 break
 
-            await asyncio.sleep(2)
+            await asyncio.sleep(5)  # deployments take minutes, no need to poll every 2s
 
             
 
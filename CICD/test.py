@@ -1,11 +1,15 @@
 import requests
-import boto3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os 
+import io
+import shutil
 from boto3.exceptions import S3UploadFailedError
-from addYamlZip import addBuildSpec, addAppSpec,fastapi_buildspec_template, fastapi_appspec_template
-from deploymentScripts import addStartScript,start_sh_template,stop_sh_template,addStopScript,addInstallScript,install_sh_template
+from CICD.addYamlZip import inject_files,append_files,fastapi_buildspec_template, fastapi_appspec_template
+from CICD.deploymentScripts import start_sh_template,stop_sh_template,install_sh_template
 import time
-from trigger_codebuild import trigger_codebuild
+from CICD.trigger_codebuild import trigger_codebuild
+from CICD._aws import s3_client, transfer_config
 import uuid
 
 
@@ -21,27 +25,37 @@ out_file = f"{REPO}-{REF}.zip"  #output file name
 
 headers = {"user":"test"}
 
-response = requests.get(zip_url, headers=headers,allow_redirects=True)  #make the request to download the zip file
-
-
-if response.status_code == 200: 
+#keep-alive session with retries on transient 5xx from github
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])))
+
+spec_files = {
+    "buildspec.yml": fastapi_buildspec_template,
+    "appspec.yml": fastapi_appspec_template,
+    "scripts/start.sh": start_sh_template,
+    "scripts/stop.sh": stop_sh_template,
+    "scripts/install.sh": install_sh_template,
+}
+
+#keep the zip in memory for the whole pipeline: download -> add files -> upload, no disk round trips
+zip_buffer = io.BytesIO()
+with session.get(zip_url, headers=headers, allow_redirects=True, stream=True) as response:  #make the request to download the zip file
+    response.raise_for_status()
+    shutil.copyfileobj(response.raw, zip_buffer, 1 << 20)
+print(f"Downloaded {out_file} successfully.")
+
+try:
+    #should be adding the yaml files and deployment scripts to the end of the zip without touching the rest
+    path = append_files(zip_buffer, spec_files)["buildspec.yml"]
+except FileExistsError:
+    #repo already has some of these files, fall back to rewriting the zip on disk so they get replaced
     with open(out_file, "wb") as file:
-        file.write(response.content)  #write the content to a file
-    print(f"Downloaded {out_file} successfully.")
-   
-    path = addBuildSpec(out_file, fastapi_buildspec_template, overWrite=True) #should be adding yaml file to the zip
-
-    print("magical path for zip file",path)
-    addAppSpec(out_file, fastapi_appspec_template, overWrite=True)
-    addStartScript(out_file, start_sh_template, overWrite=True)
-    addStopScript(out_file, stop_sh_template, overWrite=True)
-    addInstallScript(out_file, install_sh_template, overWrite=True)
+        file.write(zip_buffer.getbuffer())
+    path = inject_files(out_file, spec_files, overWrite=True)["buildspec.yml"]
+    with open(out_file, "rb") as file:
+        zip_buffer = io.BytesIO(file.read())
 
-
-
-     
-else: 
-    print(f"Failed to download file: {response.status_code} - {response.text}")
+print("magical path for zip file",path)
 
 
 
@@ -58,19 +72,20 @@ S3_KEY = f"{OWNER}/{out_file}"  # the path for the file in the s3 bucket
 def codeDeploy(): 
     print("code deploy called")
 
-def upload_to_s3(file_name, bucket, object_name): 
+
+def upload_to_s3(file_obj, bucket, object_name): 
    
-    s3_client = boto3.client('s3') 
     try:
-        s3_client.upload_file(file_name, bucket, object_name) #upload the file to s3
-        print(f"Uploaded {file_name} to s3://{bucket}/{object_name} successfully.")
+        file_obj.seek(0)
+        s3_client.upload_fileobj(file_obj, bucket, object_name, Config=transfer_config) #upload the in-memory zip to s3
+        print(f"Uploaded to s3://{bucket}/{object_name} successfully.")
 
     except S3UploadFailedError as e:
         print(f"Failed to upload file to S3: {e}")  
 
 
 
-upload_to_s3(out_file, S3_BUCKET_NAME, S3_KEY)
+upload_to_s3(zip_buffer, S3_BUCKET_NAME, S3_KEY)
 trigger_codebuild("foundryCICD",S3_BUCKET_NAME,S3_KEY,path,f"{OWNER}-{REPO}")
 
 
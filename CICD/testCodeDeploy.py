@@ -49,4 +49,5 @@ def codeDeploy():
         print(f"Failed to trigger CodeDeploy: {e}")
 
 
-codeDeploy()
\ No newline at end of file
+if __name__ == "__main__": #only deploy when run directly, never on import
+    codeDeploy()
@@ -1,15 +1,15 @@
-import boto3 
-import time 
+import asyncio
+import random
 import uuid
+from CICD._aws import codebuild_client
 
 
 async def trigger_codebuild(project_name, s3_bucket, s3_key,path,id,emit_func,tag): #in the future it will be their build id or something
 
-    codebuild_client = boto3.client('codebuild',region_name='us-east-1')
-    
     try:
        
-        response = codebuild_client.start_build(
+        response = await asyncio.to_thread(
+            codebuild_client.start_build,
             projectName=project_name,
             sourceTypeOverride='S3',
             sourceLocationOverride=f"{s3_bucket}/{s3_key}",
@@ -31,10 +31,11 @@ async def trigger_codebuild(project_name, s3_bucket, s3_key,path,id,emit_func,ta
         
         print(f"CodeBuild started successfully!")
 
-        while True: #checking for the build status every 10 seconds until it is complete
-            build_id = response['build']['id']
+        build_id = response['build']['id']
+        attempt = 0
+        while True: #checking the build status with exponential backoff (1s, 2s, 4s ... capped at 16s) plus jitter until it is complete
         
-            build_info = codebuild_client.batch_get_builds(ids=[build_id]) #api call to get build info
+            build_info = await asyncio.to_thread(codebuild_client.batch_get_builds, ids=[build_id]) #api call to get build info
             build_status = build_info['builds'][0]['buildStatus'] 
             print(f"Current build status: {build_status}")
             
@@ -42,13 +43,8 @@ async def trigger_codebuild(project_name, s3_bucket, s3_key,path,id,emit_func,ta
             
             if build_status in ['SUCCEEDED', 'FAILED', 'FAULT', 'STOPPED', 'TIMED_OUT']:
                 break
-            time.sleep(10)
-
-
-            if(build_status == 'SUCCEEDED'):
-                #codeDeploy()
-                print('hello world')
-
+            await asyncio.sleep(2 ** min(attempt, 4) + random.uniform(0, 1)) #asyncio.sleep so other requests keep running while we wait
+            attempt += 1
                
         
         return {
@@ -1,12 +1,12 @@
-import boto3
 from boto3.exceptions import S3UploadFailedError
 from CICD import trigger_codebuild
+from CICD._aws import s3_client, transfer_config
 import time
+
 def upload_to_s3(file_name, bucket, object_name): 
    
-    s3_client = boto3.client('s3') 
     try:
-        s3_client.upload_file(file_name, bucket, object_name) #upload the file to s3
+        s3_client.upload_file(file_name, bucket, object_name, Config=transfer_config) #upload the file to s3
         print(f"Uploaded {file_name} to s3://{bucket}/{object_name} successfully.")
 
 
@@ -1,6 +1,8 @@
 """
 Check what tables exist in the database
 """
+from itertools import groupby
+from operator import itemgetter
 from database import get_db_connection
 
 try:
@@ -10,33 +12,24 @@ try:
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Query to list all tables
+        # One query for every column of every table, grouped by table below
         cursor.execute("""
-            SELECT table_name 
-            FROM information_schema.tables 
+            SELECT table_name, column_name, data_type, is_nullable
+            FROM information_schema.columns
             WHERE table_schema = 'public'
-            ORDER BY table_name
+            ORDER BY table_name, ordinal_position
         """)
         
-        tables = cursor.fetchall()
+        tables = [(table_name, list(columns)) for table_name, columns in groupby(cursor.fetchall(), key=itemgetter(0))]
         
         if tables:
             print(f"\nFound {len(tables)} table(s):")
-            for table in tables:
-                print(f"  - {table[0]}")
+            for table_name, columns in tables:
+                print(f"  - {table_name}")
                 
-                # Get column details for each table
-                cursor.execute("""
-                    SELECT column_name, data_type, is_nullable
-                    FROM information_schema.columns
-                    WHERE table_name = %s
-                    ORDER BY ordinal_position
-                """, (table[0],))
-                
-                columns = cursor.fetchall()
                 for col in columns:
-                    nullable = "NULL" if col[2] == 'YES' else "NOT NULL"
-                    print(f"      {col[0]}: {col[1]} {nullable}")
+                    nullable = "NULL" if col[3] == 'YES' else "NOT NULL"
+                    print(f"      {col[1]}: {col[2]} {nullable}")
                 print()
         else:
             print("\nNo tables found in database")
@@ -3,10 +3,15 @@ Database connection and operations for RDS PostgreSQL.
 """
 import psycopg2
 from psycopg2.extras import RealDictCursor, Json
-from typing import Dict, Any, Optional
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from typing import Dict, Any, List, Optional, Tuple
 from fastapi import HTTPException
+import csv
+import io
+import json
 import os
 import random
+import threading
 from contextlib import contextmanager
 from dotenv import load_dotenv
 
@@ -25,28 +30,81 @@ DB_CONFIG = {
 }
 
 
+# Shared pool, created on first use so importing this module doesn't need the database
+# Sized to FastAPI's sync threadpool (40 workers) so every worker can hold a connection
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 40))
+_POOL: Optional[ThreadedConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> ThreadedConnectionPool:
+    """
+    Return the process-wide connection pool, creating it on first call.
+    Reusing connections skips the TCP + SSL handshake on every query.
+    """
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadedConnectionPool(minconn=1, maxconn=DB_POOL_MAX, **DB_CONFIG)
+    return _POOL
+
+
+def _borrow(pool: ThreadedConnectionPool):
+    """
+    Take a live connection from the pool.
+    Idle connections can be killed server-side (idle timeout, RDS failover or
+    restart) while still looking open, so each one is checked with SELECT 1 and
+    discarded if dead; once the idle ones run out getconn() opens a fresh one.
+    """
+    for _ in range(DB_POOL_MAX + 1):
+        conn = pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()  # end the transaction the check opened
+            return conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError("Could not get a live database connection from the pool")
+
+
 @contextmanager
 def get_db_connection():
     """
     Context manager for database connections.
-    Automatically handles connection closing.
+    Borrows a connection from the pool and returns it when done. If the pool
+    is exhausted, opens a one-off connection instead of failing the request.
     
     Usage:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users")
     """
-    conn = None
+    pool = _get_pool()
     try:
+        conn = _borrow(pool)
+        pooled = True
+    except PoolError:
         conn = psycopg2.connect(**DB_CONFIG)
+        pooled = False
+    broken = False
+    try:
         yield conn
         conn.commit()
     except Exception as e:
-        if conn:
-            conn.rollback()
+        broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        if not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                pass
         raise e
     finally:
-        if conn:
+        if pooled:
+            # Drop connections that died mid-request instead of handing them out again
+            pool.putconn(conn, close=broken or bool(conn.closed))
+        else:
             conn.close()
 
 
@@ -124,6 +182,54 @@ def save_build(owner_id: int, canvas: Dict[str, Any], cf_template: Optional[Dict
         raise Exception("Failed to save build: exceeded maximum retry attempts")
 
 
+def save_builds_bulk(rows: List[Tuple[int, Dict[str, Any], Optional[Dict[str, Any]]]]) -> List[int]:
+    """
+    Save many builds at once with a single COPY, e.g. when migrating canvases.
+    Each build gets an 8-digit ID like save_build; a collision with an existing
+    build retries the whole batch with fresh IDs.
+    
+    Args:
+        rows: (owner_id, canvas, cf_template) tuples, cf_template may be None
+        
+    Returns:
+        build_ids: IDs of the created builds, in the same order as rows
+    """
+    if not rows:
+        return []
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        max_attempts = 10
+        for attempt in range(max_attempts):
+            # Distinct IDs within the batch, collisions with stored builds are caught below
+            build_ids = random.sample(range(10000000, 100000000), len(rows))
+            
+            csv_buf = io.StringIO()
+            writer = csv.writer(csv_buf)
+            for build_id, (owner_id, canvas, cf_template) in zip(build_ids, rows):
+                # Empty unquoted field is NULL in COPY's csv format
+                writer.writerow((build_id, owner_id, json.dumps(canvas), json.dumps(cf_template) if cf_template else None))
+            csv_buf.seek(0)
+            
+            try:
+                cursor.copy_expert(
+                    "COPY build (id, owner_id, canvas, cf_template) FROM STDIN WITH (FORMAT csv)",
+                    csv_buf
+                )
+                print(f"✓ Saved {len(build_ids)} builds")
+                return build_ids
+                
+            except psycopg2.errors.UniqueViolation:
+                # ID collision - rollback and try again with new IDs
+                conn.rollback()
+                if attempt == max_attempts - 1:
+                    raise Exception(f"Failed to generate unique build IDs after {max_attempts} attempts")
+                continue
+        
+        raise Exception("Failed to save builds: exceeded maximum retry attempts")
+
+
 def get_build(build_id: int) -> Optional[Dict[str, Any]]:
     """
     Get build by ID.
@@ -235,6 +341,8 @@ def log_activity(build_id: int, user_id: int, change: str):
             (build_id, user_id, change)
         )
         print(f"✓ Activity logged for build {build_id}")
+
+
 def get_access_token_for_owner(owner_username: str) -> str:
    """
    Retrieves the GitHub access token from the dedicated encrypted column.
@@ -7,8 +7,8 @@ from dotenv import load_dotenv
 import requests
 from CICD.trigger_codebuild import trigger_codebuild
 from CICD.code_Deploy import codeDeploy
-from CICD.addYamlZip import addBuildSpec, addAppSpec,fastapi_buildspec_template, fastapi_appspec_template
-from CICD.deploymentScripts import addStartScript,start_sh_template,stop_sh_template,addStopScript,addInstallScript,install_sh_template
+from CICD.addYamlZip import inject_files,fastapi_buildspec_template, fastapi_appspec_template
+from CICD.deploymentScripts import start_sh_template,stop_sh_template,install_sh_template
 from CICD.upload_s3 import upload_to_s3
 from github_webhook_test.add_webhook import create_github_webhook
 
@@ -62,15 +62,20 @@ async def github_webhook(request: Request):
     S3_BUCKET_NAME = "foundry-codebuild-zip"
     S3_KEY = f"{owner}/{out_file}"
 
-    response = requests.get(zip_url, allow_redirects=True)
+    response = requests.get(zip_url, allow_redirects=True, stream=True)
     if response.status_code == 200:
         with open(out_file, "wb") as f:
-            f.write(response.content)
-        path = addBuildSpec(out_file, fastapi_buildspec_template, overWrite=True)
-        addAppSpec(out_file, fastapi_appspec_template, overWrite=True)
-        addStopScript(out_file, stop_sh_template, overWrite=True)
-        addInstallScript(out_file, install_sh_template, overWrite=True)
-        addStartScript(out_file, start_sh_template, overWrite=True)
+            # Stream to disk in 1 MiB chunks instead of buffering the whole zip
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+        # Inject every spec/script in one rewrite of the zip
+        path = inject_files(out_file, {
+            "buildspec.yml": fastapi_buildspec_template,
+            "appspec.yml": fastapi_appspec_template,
+            "scripts/stop.sh": stop_sh_template,
+            "scripts/install.sh": install_sh_template,
+            "scripts/start.sh": start_sh_template,
+        }, overWrite=True)["buildspec.yml"]
     else:
         print(f"Failed to download repo: {response.status_code}")
         return {"message": "Download failed"}
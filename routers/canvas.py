@@ -7,16 +7,15 @@ from pathlib import Path
 import httpx
 from database import save_build, log_activity, get_build, update_build_canvas_and_template, get_builds_by_owner
 import boto3
-from CICD.addYamlZip import addAppSpec, addBuildSpec, fastapi_appspec_template,fastapi_buildspec_template
+from CICD.addYamlZip import inject_files, fastapi_appspec_template,fastapi_buildspec_template
 from CICD.upload_s3 import upload_to_s3
 import time
 from CICD.trigger_codebuild import trigger_codebuild
-from CICD.deploymentScripts import addStartScript,start_sh_template,stop_sh_template,addStopScript,addInstallScript,install_sh_template
+from CICD.deploymentScripts import start_sh_template,stop_sh_template,install_sh_template
 from CICD.code_Deploy import codeDeploy
 import requests
 #settings imports 
 from settings.get_user import get_users
-from dotenv import load_dotenv
 import os
 import asyncpg,asyncio
 from datetime import datetime
@@ -123,7 +122,7 @@ def deploy_initiate(request: DeployRequest):
                 # Get the generated CloudFormation template
                 from CFCreators.CFCreator import createGeneration
                 cf_template = createGeneration(canvas_data, build_id=str(build_id), save_to_file=True)
-                template_json = json.loads(cf_template.to_json())
+                template_json = cf_template.to_dict()
                 
                 # Update build with canvas and CF template
                 update_build_canvas_and_template(
@@ -296,8 +295,8 @@ def deploy_update(request: UpdateRequest):
         
         # Step 3: Create change set
         print(f"\n[3/5] Creating CloudFormation change set for stack '{request.stack_name}'...")
-        from CFCreators.aws_deployer import CloudFormationDeployer
-        deployer = CloudFormationDeployer(region=request.region)
+        from CFCreators.aws_deployer import get_cached_deployer
+        deployer = get_cached_deployer(request.region)
         
         # Get VPC resources
         vpc_resources = deployer.get_default_vpc_resources()
@@ -411,10 +410,10 @@ def execute_changeset(
     print(f"Build ID: {build_id}")
     
     try:
-        from CFCreators.aws_deployer import CloudFormationDeployer
+        from CFCreators.aws_deployer import get_cached_deployer
         from database import log_activity
         
-        deployer = CloudFormationDeployer(region=region)
+        deployer = get_cached_deployer(region)
         
         # Execute the change set
         stack_id = deployer.execute_change_set(
@@ -472,9 +471,9 @@ def delete_changeset(
     print(f"Change Set: {change_set_name}")
     
     try:
-        from CFCreators.aws_deployer import CloudFormationDeployer
+        from CFCreators.aws_deployer import get_cached_deployer
         
-        deployer = CloudFormationDeployer(region=region)
+        deployer = get_cached_deployer(region)
         
         # Delete the change set
         deployer.delete_change_set(
@@ -633,7 +632,7 @@ async def cicd(Data: dict):
 
     headers = {"user":"test"}
 
-    response = requests.get(zip_url, headers=headers,allow_redirects=True)  #make the request to download the zip file
+    response = requests.get(zip_url, headers=headers,allow_redirects=True, stream=True)  #make the request to download the zip file, body is streamed below
 
     S3_BUCKET_NAME = "foundry-codebuild-zip"
 
@@ -646,13 +645,17 @@ async def cicd(Data: dict):
 
     if response.status_code == 200: 
         with open(out_file, "wb") as file:
-            file.write(response.content)  #write the content to a file
+            for chunk in response.iter_content(chunk_size=1 << 20):  #write the content to a file 1 MiB at a time
+                file.write(chunk)
         print(f"Downloaded {out_file} successfully.")
-        path = addBuildSpec(out_file, fastapi_buildspec_template, overWrite=True)
-        addAppSpec(out_file,fastapi_appspec_template, overWrite=True)
-        addStopScript(out_file, stop_sh_template, overWrite=True)
-        addInstallScript(out_file, install_sh_template, overWrite=True)
-        addStartScript(out_file, start_sh_template, overWrite=True)
+        # Inject every spec/script in one rewrite of the zip
+        path = inject_files(out_file, {
+            "buildspec.yml": fastapi_buildspec_template,
+            "appspec.yml": fastapi_appspec_template,
+            "scripts/stop.sh": stop_sh_template,
+            "scripts/install.sh": install_sh_template,
+            "scripts/start.sh": start_sh_template,
+        }, overWrite=True)["buildspec.yml"]
        
     else: 
         print(f"Failed to download file: {response.status_code} - {response.text}")
@@ -686,8 +689,6 @@ async def cicd(Data: dict):
 
 @router.get("/users")
 async def get_user_info():
-    load_dotenv()
-
     DATABASE_URL = os.getenv("DATABASE_URL")
 
     print("DATABASE_URL:", DATABASE_URL)
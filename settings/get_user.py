@@ -2,10 +2,10 @@ from dotenv import load_dotenv
 import os
 import asyncio,asyncpg
 
-async def get_users(): 
+load_dotenv()  # Load environment variables once at import, not on every request
 
+async def get_users(): 
 
-    load_dotenv()
 
     DATABASE_URL = os.getenv("DATABASE_URL")
 
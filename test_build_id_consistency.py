@@ -3,7 +3,6 @@ Test script to verify build ID consistency across the system.
 """
 from database import save_build, get_build
 from CFCreators.CFCreator import createGeneration, deployToAWS
-import json
 
 # Test canvas data
 test_canvas = {
@@ -42,7 +41,7 @@ try:
         build_id=str(build_id),
         save_to_file=True
     )
-    template_json = json.loads(cf_template.to_json())
+    template_json = cf_template.to_dict()
     
     print(f"✓ CloudFormation template generated")
     print(f"  - File saved as: CF_{build_id}.json")
@@ -5,7 +5,7 @@ Quick test: Deploy a simple stack, then test update functionality.
 import json
 import time
 from CFCreators.CFCreator import deployToAWS, createGeneration
-from CFCreators.aws_deployer import CloudFormationDeployer
+from CFCreators.aws_deployer import get_cached_deployer
 
 # Simple test canvas - EC2 only
 initial_canvas = {
@@ -97,7 +97,7 @@ try:
     print("=" * 80)
     print("Change: EC2 instance type t2.micro → t2.small")
     
-    deployer = CloudFormationDeployer(region='us-east-1')
+    deployer = get_cached_deployer('us-east-1')
     
     # Generate new template
     new_template = createGeneration(updated_canvas)
@@ -5,9 +5,11 @@ Test script to verify RDS parameter is only added when RDS nodes exist
 import json
 from CFCreators.template_composer import make_stack_template
 
-print("=" * 80)
-print("TEST 1: EC2 + S3 (No RDS) - Should NOT have DBSubnetGroupName parameter")
-print("=" * 80)
+print("\n".join([
+    "=" * 80,
+    "TEST 1: EC2 + S3 (No RDS) - Should NOT have DBSubnetGroupName parameter",
+    "=" * 80,
+]))
 
 test_ec2_s3 = {
     "nodes": [
@@ -41,18 +43,22 @@ template = make_stack_template(test_ec2_s3)
 params = list(template.parameters.keys())
 resources = list(template.resources.keys())
 
-print(f"✓ Parameters: {params}")
-print(f"✓ Resources: {resources}")
-print(f"✓ Has DBSubnetGroupName: {'DBSubnetGroupName' in params}")
+print("\n".join([
+    f"✓ Parameters: {params}",
+    f"✓ Resources: {resources}",
+    f"✓ Has DBSubnetGroupName: {'DBSubnetGroupName' in params}",
+]))
 
 if 'DBSubnetGroupName' in params:
     print("✗ FAILED: DBSubnetGroupName should NOT be present without RDS!")
 else:
     print("✓ SUCCESS: DBSubnetGroupName correctly omitted when no RDS")
 
-print("\n" + "=" * 80)
-print("TEST 2: RDS Only - Should have DBSubnetGroupName parameter")
-print("=" * 80)
+print("\n".join([
+    "\n" + "=" * 80,
+    "TEST 2: RDS Only - Should have DBSubnetGroupName parameter",
+    "=" * 80,
+]))
 
 test_rds = {
     "nodes": [
@@ -74,15 +80,19 @@ template_rds = make_stack_template(test_rds)
 params_rds = list(template_rds.parameters.keys())
 resources_rds = list(template_rds.resources.keys())
 
-print(f"✓ Parameters: {params_rds}")
-print(f"✓ Resources: {resources_rds}")
-print(f"✓ Has DBSubnetGroupName: {'DBSubnetGroupName' in params_rds}")
+print("\n".join([
+    f"✓ Parameters: {params_rds}",
+    f"✓ Resources: {resources_rds}",
+    f"✓ Has DBSubnetGroupName: {'DBSubnetGroupName' in params_rds}",
+]))
 
 if 'DBSubnetGroupName' not in params_rds:
     print("✗ FAILED: DBSubnetGroupName SHOULD be present with RDS!")
 else:
     print("✓ SUCCESS: DBSubnetGroupName correctly added for RDS")
 
-print("\n" + "=" * 80)
-print("All tests completed!")
-print("=" * 80)
+print("\n".join([
+    "\n" + "=" * 80,
+    "All tests completed!",
+    "=" * 80,
+]))
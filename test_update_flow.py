@@ -8,7 +8,7 @@ This script tests:
 """
 
 import json
-from CFCreators.aws_deployer import CloudFormationDeployer
+from CFCreators.aws_deployer import get_cached_deployer
 
 # Test canvas data - simulating a simple EC2 update
 # Original: t2.micro instance
@@ -75,7 +75,7 @@ def test_update_flow():
     try:
         # Initialize deployer
         print("\n[1/5] Initializing AWS deployer...")
-        deployer = CloudFormationDeployer(region=region)
+        deployer = get_cached_deployer(region)
         print("  ✓ Deployer initialized")
         
         # Check if stack exists
@@ -195,7 +195,7 @@ def test_no_changes():
     
     try:
         print("\n[1/3] Initializing...")
-        deployer = CloudFormationDeployer(region=region)
+        deployer = get_cached_deployer(region)
         
         print("\n[2/3] Getting current stack template...")
         # Get the current template from the stack